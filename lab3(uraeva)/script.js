@@ -1,5 +1,8 @@
 let currentWord = ''; // Текущее слово
 
+// Адрес локального сервиса проверки слов (uraeva/word_service.py)
+const API_URL = 'http://127.0.0.1:8765';
+
 // Функция для добавления буквы в слово
 function addLetter(letter) {
     currentWord += letter; // Добавляем букву к текущему слову
@@ -17,13 +20,55 @@ function deleteLetter() {
     document.getElementById('input-field').value = currentWord; // Обновляем поле ввода
 }
 
-// Функция для проверки слова (заглушка)
-function checkWord() {
-    // Логика для проверки правильности слова
-    // Здесь можно добавить проверку, но пока просто заглушка
-    alert('Проверка слова: ' + currentWord);
+// Функция для проверки слова через сервис
+async function checkWord() {
+    const word = currentWord.trim();
+    if (!word) {
+        alert('Введите слово!');
+        return;
+    }
+    try {
+        const response = await fetch(API_URL + '/check?word=' + encodeURIComponent(word));
+        const result = await response.json();
+        if (!response.ok) {
+            alert('Ошибка: ' + result.error);
+        } else if (result.valid) {
+            alert('«' + result.word + '» принято!');
+        } else {
+            alert('«' + result.word + '»: такого слова не существует!');
+        }
+    } catch (error) {
+        alert('Сервис проверки слов недоступен');
+    }
+    currentWord = '';
+    document.getElementById('input-field').value = currentWord;
 }
 
+// Функция для загрузки таблицы лидеров из сервиса
+async function loadLeaderboard() {
+    const table = document.getElementById('leaderboard-table');
+    if (!table) {
+        return;
+    }
+    try {
+        const response = await fetch(API_URL + '/leaderboard?limit=20');
+        const result = await response.json();
+        // Оставляем строку заголовка, остальные строки заменяем данными сервиса
+        while (table.rows.length > 1) {
+            table.deleteRow(1);
+        }
+        for (const row of result.rows) {
+            const tr = table.insertRow();
+            tr.insertCell().textContent = row.user;
+            tr.insertCell().textContent = row.score;
+        }
+    } catch (error) {
+        // Сервис не запущен: остаётся статическая таблица
+    }
+}
+
+document.addEventListener('DOMContentLoaded', loadLeaderboard);
+
 // Функция для начала игры и отсчета времени
 function startGame() {
     let timeLeft = 60;
@@ -50,7 +95,7 @@ function startGame() {
 const toggle = document.getElementById('tips-toggle');
 const statusText = document.getElementById('tips-status');
 
-toggle.addEventListener('change', function() {
+if (toggle) toggle.addEventListener('change', function() {
     if (toggle.checked) {
         statusText.textContent = 'Подсказки включены.';
     } else {
@@ -0,0 +1,115 @@
+"""Пакетная проверка списка слов без интерфейса.
+
+Пример:
+    python batch_validate.py слова.txt --accepted принятые.txt --rejected отклонённые.txt
+"""
+import argparse
+import itertools
+import os
+import sys
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+
+from morph_loader import analyze
+from validation_cache import ValidationCache, normalize_word
+from word_store import WordStore
+
+_morph = None
+
+
+def _init_worker():
+    global _morph
+    from pymorphy3 import MorphAnalyzer
+    _morph = MorphAnalyzer()
+
+
+def validate_chunk(words):
+    """Проверяет пачку слов в процессе-исполнителе; возвращает пары (слово, лемма или None)"""
+    return [(word, analyze(_morph, word)) for word in words]
+
+
+def read_words(path):
+    """Построчно читает файл и отдаёт нормализованные слова без повторов"""
+    seen = set()
+    with open(path, 'r', encoding='utf-8') as f:
+        for line in f:
+            word = normalize_word(line)
+            if word and word not in seen:
+                seen.add(word)
+                yield word
+
+
+def chunked(iterable, size):
+    iterator = iter(iterable)
+    while True:
+        chunk = list(itertools.islice(iterator, size))
+        if not chunk:
+            return
+        yield chunk
+
+
+def validate_file(path, workers=None, chunk_size=2000):
+    """Отдаёт результаты проверки по мере готовности, сохраняя порядок входного файла.
+
+    Одновременно в работе держится не больше двух пачек на процесс,
+    поэтому файл любого размера читается потоково.
+    """
+    workers = workers or os.cpu_count() or 1
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker) as executor:
+        in_flight = deque()
+        for chunk in chunked(read_words(path), chunk_size):
+            in_flight.append(executor.submit(validate_chunk, chunk))
+            if len(in_flight) >= workers * 2:
+                yield from in_flight.popleft().result()
+        while in_flight:
+            yield from in_flight.popleft().result()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Пакетная проверка слов через pymorphy3")
+    parser.add_argument("input", help="файл со словами, по одному в строке")
+    parser.add_argument("--accepted", default="accepted.txt", help="куда писать принятые слова")
+    parser.add_argument("--rejected", default="rejected.txt", help="куда писать отклонённые слова")
+    parser.add_argument("--normalized", default="normalized.txt",
+                        help="куда писать пары 'слово<TAB>начальная форма'")
+    parser.add_argument("--dictionary", help="добавить леммы принятых слов в этот файл словаря")
+    parser.add_argument("--cache", help="записать пары форма -> лемма в этот кэш проверок "
+                                        "(заранее прогреть проверки.cache для игры)")
+    parser.add_argument("--workers", type=int, default=None, help="число процессов")
+    parser.add_argument("--chunk-size", type=int, default=2000, help="слов в одной пачке")
+    args = parser.parse_args(argv)
+
+    store = WordStore(args.dictionary, flush_every=args.chunk_size) if args.dictionary else None
+    cache = ValidationCache(args.cache) if args.cache else None
+    accepted = rejected = 0
+    start = time.perf_counter()
+    with open(args.accepted, 'w', encoding='utf-8') as accepted_file, \
+            open(args.rejected, 'w', encoding='utf-8') as rejected_file, \
+            open(args.normalized, 'w', encoding='utf-8') as normalized_file:
+        for word, lemma in validate_file(args.input, args.workers, args.chunk_size):
+            if cache is not None:
+                cache.put(word, lemma)
+            if lemma is None:
+                rejected += 1
+                rejected_file.write(f"{word}\n")
+                continue
+            accepted += 1
+            accepted_file.write(f"{word}\n")
+            normalized_file.write(f"{word}\t{lemma}\n")
+            if store is not None:
+                store.add(lemma)
+    if store is not None:
+        store.close()
+    if cache is not None:
+        cache.save()
+
+    elapsed = time.perf_counter() - start
+    total = accepted + rejected
+    rate = total / elapsed if elapsed else 0.0
+    print(f"Проверено {total} слов за {elapsed:.2f} с ({rate:.0f} слов/с): "
+          f"принято {accepted}, отклонено {rejected}", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
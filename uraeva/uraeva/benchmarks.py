@@ -0,0 +1,263 @@
+"""Бенчмарки горячих путей игры.
+
+Меряет поиск леммы lemma_of (холодный и тёплый кэш), add_to_dictionary и открытие
+словаря на словарях разного размера, а также highlight_word и on_click
+на поддельных виджетах (без дисплея). Результаты пишутся в JSON и
+сравниваются с сохранённой базой, чтобы регрессии были видны до релиза.
+
+Примеры:
+    python benchmarks.py --save-baseline            # записать bench_baseline.json
+    python benchmarks.py --output results.json      # сравнить с базой, код 1 при регрессии
+    python benchmarks.py --sizes 1000 100000 1000000
+"""
+import argparse
+import bisect
+import json
+import os
+import platform
+import random
+import statistics
+import sys
+import tempfile
+import time
+
+from engine import GameEngine
+from morph_loader import MorphLoader
+from solver import Trie
+from test1 import LetterGridApp
+from validation_cache import ValidationCache
+from word_store import WordStore
+
+ALPHABET = "абвгдежзийклмнопрстуфхцчшщыэюя"
+REAL_WORDS = ["дом", "кот", "машина", "поза", "стол", "окно", "река", "лес", "город",
+              "слово", "игра", "буква", "время", "книга", "друг", "школа"]
+
+
+def synthetic_words(count, seed=0):
+    rng = random.Random(seed)
+    words = set()
+    while len(words) < count:
+        words.add("".join(rng.choice(ALPHABET) for _ in range(rng.randint(3, 10))))
+    return sorted(words)
+
+
+REPEAT = 5
+
+
+def measure(func, repeat=REPEAT):
+    """Медиана времени (в секундах) нескольких запусков func()"""
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        times.append(time.perf_counter() - start)
+    return statistics.median(times)
+
+
+class CountingWidget:
+    calls = 0
+
+    def config(self, **options):
+        CountingWidget.calls += 1
+
+
+class FakeApp:
+    """Поддельное приложение: настоящие методы LetterGridApp поверх виджетов-счётчиков"""
+
+    highlight_word = LetterGridApp.highlight_word
+    on_click = LetterGridApp.on_click
+    load_form_prefixes = LetterGridApp.load_form_prefixes
+    add_to_dictionary = LetterGridApp.add_to_dictionary
+    lemma_of = LetterGridApp.lemma_of
+    find_lemma = LetterGridApp.find_lemma
+    parse_lemma = LetterGridApp.parse_lemma
+    record = LetterGridApp.record
+    morph = LetterGridApp.morph
+
+    def __init__(self, rows=5, cols=6, seed=0, word_store=None, morph_loader=None):
+        rng = random.Random(seed)
+        self.themes = {'Dark': {'button_bg': '#3e3e3e', 'highlight': '#4a9dff', 'extend': '#35604a',
+                                'text_wrap': 15}}
+        self.current_theme = 'Dark'
+        letters = [[rng.choice(ALPHABET).upper() for _ in range(cols)] for _ in range(rows)]
+        self.engine = GameEngine(letters)
+        self.grid_buttons = [[CountingWidget() for _ in range(cols)] for _ in range(rows)]
+        self.highlighted_cells = {}
+        # Trie.next_letters stands in for the analyzer's FormPrefixes
+        self.form_prefixes = Trie()
+        self.current_word_label = CountingWidget()
+        self.check_button = CountingWidget()
+        self.word_store = word_store
+        self.morph_loader = morph_loader
+        self.service = None
+        self.replay = None
+        self.validation_cache = ValidationCache()
+
+
+def full_repaint(app):
+    """Прежний highlight_word: сброс всех кнопок и полный поиск каждой буквы"""
+    theme = app.themes[app.current_theme]
+    for row in app.grid_buttons:
+        for button in row:
+            button.config(bg=theme['button_bg'])
+    for letter in app.engine.selected_letters():
+        for i, row in enumerate(app.engine.state.letters):
+            for j, cell in enumerate(row):
+                if cell == letter:
+                    app.grid_buttons[i][j].config(bg=theme['highlight'])
+                    break
+
+
+def bench_clicks(results, rows, cols, words=500, word_length=6):
+    cells = [(i, j) for i in range(rows) for j in range(cols)]
+    trie = Trie(synthetic_words(20000))
+    for name, render in [("full_repaint", full_repaint),
+                         ("highlight_word", FakeApp.highlight_word),
+                         ("on_click", None)]:
+        app = FakeApp(rows, cols)
+        app.form_prefixes = trie
+        rng = random.Random(1)
+        clicks = 0
+        CountingWidget.calls = 0
+
+        def play():
+            nonlocal clicks
+            for _ in range(words):
+                for i, j in rng.sample(cells, min(word_length, len(cells))):
+                    if render is None:
+                        app.on_click(i, j)
+                    else:
+                        app.engine.select_cell(i, j)
+                        render(app)
+                    clicks += 1
+                app.engine.take_word()
+                (render or FakeApp.highlight_word)(app)
+
+        seconds = measure(play)
+        key = f"{name}_{rows}x{cols}"
+        results[key] = {'us_per_op': seconds / (clicks / REPEAT) * 1e6,
+                        'tk_calls_per_op': CountingWidget.calls / clicks}
+
+
+def bench_morph(results, count=300):
+    loader = MorphLoader().start()
+    start = time.perf_counter()
+    loader.get()
+    results['morph_load'] = {'us_per_op': (time.perf_counter() - start) * 1e6}
+
+    words = REAL_WORDS + synthetic_words(count - len(REAL_WORDS), seed=7)
+    app = FakeApp(word_store=set(), morph_loader=loader)
+
+    def cold():
+        app.validation_cache = ValidationCache()
+        for word in words:
+            app.lemma_of(word)
+
+    def warm():
+        for word in words:
+            app.lemma_of(word)
+
+    results['pymorphy_check_cold'] = {'us_per_op': measure(cold) / len(words) * 1e6}
+    results['pymorphy_check_warm'] = {'us_per_op': measure(warm) / len(words) * 1e6}
+
+
+def bench_dictionary(results, size, workdir, adds=1000):
+    path = os.path.join(workdir, f"словарь_{size}.txt")
+    words = synthetic_words(size)
+    with open(path, 'w', encoding='utf-8') as f:
+        f.writelines(f"{word}\n" for word in words)
+    WordStore(path, compiled=True)  # build the binary file outside the timings
+
+    def open_dictionary():
+        store = WordStore(path, compiled=True)
+        view = store.sorted_words
+        view[0:20]
+        lo = bisect.bisect_left(view, "ко")
+        view[lo:lo + 20]
+
+    results[f'dictionary_open_{size}'] = {'us_per_op': measure(open_dictionary) * 1e6}
+
+    new_words = [word + "ъ" for word in synthetic_words(adds, seed=size)]
+    app = FakeApp(word_store=WordStore(path, compiled=True, compact_min=10 ** 9))
+
+    def add():
+        for word in new_words:
+            app.add_to_dictionary(word)
+        app.word_store.flush()
+
+    seconds = measure(add, repeat=1)
+    results[f'add_to_dictionary_{size}'] = {'us_per_op': seconds / adds * 1e6}
+
+
+def run(sizes, include_morph=True):
+    results = {}
+    bench_clicks(results, 5, 6)
+    bench_clicks(results, 10, 10)
+    if include_morph:
+        bench_morph(results)
+    with tempfile.TemporaryDirectory() as workdir:
+        for size in sizes:
+            bench_dictionary(results, size, workdir)
+    return {
+        'meta': {
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'time': time.time(),
+        },
+        'results': results,
+    }
+
+
+def compare(report, baseline, threshold):
+    """Печатает сравнение с базой; возвращает список замедлившихся бенчмарков"""
+    regressions = []
+    print(f"{'бенчмарк':<32} {'мкс':>12} {'база':>12} {'изм.':>8}")
+    for name, result in sorted(report['results'].items()):
+        current = result['us_per_op']
+        base = baseline.get('results', {}).get(name, {}).get('us_per_op')
+        if base:
+            ratio = current / base
+            flag = "  <-- регрессия" if ratio > threshold else ""
+            print(f"{name:<32} {current:>12.2f} {base:>12.2f} {ratio:>7.2f}x{flag}")
+            if ratio > threshold:
+                regressions.append(name)
+        else:
+            print(f"{name:<32} {current:>12.2f} {'—':>12}")
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Бенчмарки горячих путей игры")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1000, 100000],
+                        help="размеры словарей для add_to_dictionary и открытия словаря")
+    parser.add_argument("--output", help="куда записать результаты в JSON")
+    parser.add_argument("--baseline", default="bench_baseline.json", help="файл базы")
+    parser.add_argument("--save-baseline", action="store_true", help="сохранить результаты как базу")
+    parser.add_argument("--threshold", type=float, default=1.3,
+                        help="во сколько раз можно замедлиться без регрессии")
+    parser.add_argument("--no-morph", action="store_true", help="не мерить pymorphy3")
+    args = parser.parse_args(argv)
+
+    report = run(args.sizes, include_morph=not args.no_morph)
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+    if args.save_baseline:
+        with open(args.baseline, 'w', encoding='utf-8') as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+        print(f"База сохранена в {args.baseline}")
+        return 0
+
+    baseline = {}
+    if os.path.exists(args.baseline):
+        with open(args.baseline, 'r', encoding='utf-8') as f:
+            baseline = json.load(f)
+    regressions = compare(report, baseline, args.threshold)
+    if regressions:
+        print(f"Регрессии: {', '.join(regressions)}")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,258 @@
+"""Компактный двоичный формат словаря, который читается через mmap.
+
+Слова хранятся отсортированными (в UTF-8) блоками по BLOCK_SIZE слов.
+Первое слово блока записано целиком, остальные — как длина общего
+с предыдущим словом префикса и оставшийся суффикс (front coding).
+Перед данными лежит таблица смещений блоков, по которой идёт двоичный поиск.
+
+В заголовке записаны длина текстового файла, из которого собран словарь,
+и последние байты этой части файла. Если текст с тех пор только дописывался,
+двоичный файл остаётся годным: дописанный хвост читается отдельно
+(см. WordStore), и пересобирать весь словарь не нужно.
+
+    заголовок:  MAGIC, число слов, размер блока, число блоков,
+                длина исходного текста, длина и байты его конца  (struct HEADER)
+    смещения:   uint32 на каждый блок, от начала данных
+    данные:     varint длина + байты первого слова,
+                затем для каждого следующего varint общий префикс,
+                varint длина суффикса и байты суффикса
+"""
+import mmap
+import os
+import struct
+
+MAGIC = b"URDICT2\0"
+HEADER = struct.Struct("<8sIIIQB64s")
+BLOCK_SIZE = 16
+# Bytes at the end of the source text kept to tell an append from a rewrite
+SOURCE_TAIL = 64
+
+
+def compiled_path(text_path):
+    return os.path.splitext(text_path)[0] + ".dict"
+
+
+def write_varint(out, value):
+    while value >= 0x80:
+        out.append((value & 0x7F) | 0x80)
+        value >>= 7
+    out.append(value)
+
+
+def read_varint(buf, pos):
+    result = shift = 0
+    while True:
+        byte = buf[pos]
+        pos += 1
+        result |= (byte & 0x7F) << shift
+        if byte < 0x80:
+            return result, pos
+        shift += 7
+
+
+def compile_dictionary(text_path, out_path=None, block_size=BLOCK_SIZE):
+    """Собирает двоичный словарь из текстового (по слову в строке)"""
+    out_path = out_path or compiled_path(text_path)
+    source = b""
+    if os.path.exists(text_path):
+        with open(text_path, 'rb') as f:
+            source = f.read()
+    words = set()
+    for line in source.decode('utf-8').splitlines():
+        word = line.strip().lower()
+        if word:
+            words.add(word.encode('utf-8'))
+    words = sorted(words)
+
+    data = bytearray()
+    offsets = []
+    previous = b""
+    for index, word in enumerate(words):
+        if index % block_size == 0:
+            offsets.append(len(data))
+            write_varint(data, len(word))
+            data += word
+        else:
+            shared = 0
+            limit = min(len(word), len(previous))
+            while shared < limit and word[shared] == previous[shared]:
+                shared += 1
+            write_varint(data, shared)
+            write_varint(data, len(word) - shared)
+            data += word[shared:]
+        previous = word
+
+    tmp_path = out_path + ".tmp"
+    with open(tmp_path, 'wb') as f:
+        tail = source[-SOURCE_TAIL:]
+        f.write(HEADER.pack(MAGIC, len(words), block_size, len(offsets),
+                            len(source), len(tail), tail))
+        f.write(struct.pack(f"<{len(offsets)}I", *offsets))
+        f.write(data)
+    os.replace(tmp_path, out_path)
+    return out_path
+
+
+def read_source(out_path):
+    """Длина и конец текста, из которого собран двоичный словарь, или None"""
+    try:
+        with open(out_path, 'rb') as f:
+            header = f.read(HEADER.size)
+    except FileNotFoundError:
+        return None
+    if len(header) < HEADER.size:
+        return None
+    magic, _, _, _, size, tail_length, tail = HEADER.unpack(header)
+    if magic != MAGIC:
+        return None
+    return size, tail[:tail_length]
+
+
+def ensure_compiled(text_path, out_path=None, allow_tail=False):
+    """Пересобирает двоичный словарь, если текстовый файл изменился.
+
+    С allow_tail=True файл, к которому только дописали строки, не
+    пересобирается: дописанное читает вызывающий код (см. CompactDictionary.source_size).
+    """
+    out_path = out_path or compiled_path(text_path)
+    source = read_source(out_path)
+    if source is None or not _source_matches(text_path, *source, allow_tail):
+        compile_dictionary(text_path, out_path)
+    return out_path
+
+
+def is_compiled(text_path, out_path=None):
+    """Собран ли двоичный словарь из текущего содержимого text_path (ничего не пишет)"""
+    source = read_source(out_path or compiled_path(text_path))
+    return source is not None and _source_matches(text_path, *source, False)
+
+
+def _source_matches(text_path, size, tail, allow_tail):
+    try:
+        with open(text_path, 'rb') as f:
+            current = os.fstat(f.fileno()).st_size
+            if current < size or (current > size and not allow_tail):
+                return False
+            f.seek(size - len(tail))
+            return f.read(len(tail)) == tail
+    except FileNotFoundError:
+        return size == 0
+
+
+class CompactDictionary:
+    """Отсортированный словарь поверх mmap; слова декодируются только при обращении.
+
+    Ведёт себя как отсортированная последовательность строк: поддерживает
+    len(), индексы и срезы, in и итерацию, поэтому подходит для bisect.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        with open(path, 'rb') as f:
+            size = os.fstat(f.fileno()).st_size
+            self.mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) if size else None
+        buf = self.mm if self.mm is not None else b""
+        if len(buf) < HEADER.size:
+            raise ValueError(f"{path}: файл словаря повреждён")
+        (magic, self.count, self.block_size, self.block_count,
+         self.source_size, tail_length, tail) = HEADER.unpack_from(buf, 0)
+        self.source_tail = tail[:tail_length]
+        if magic != MAGIC:
+            raise ValueError(f"{path}: неизвестный формат словаря")
+        self.data_start = HEADER.size + 4 * self.block_count
+        self.offsets = memoryview(self.mm)[HEADER.size:self.data_start].cast('I')
+
+    def close(self):
+        self.offsets.release()
+        self.mm.close()
+
+    def __len__(self):
+        return self.count
+
+    def _block_first(self, block):
+        pos = self.data_start + self.offsets[block]
+        length, pos = read_varint(self.mm, pos)
+        return self.mm[pos:pos + length]
+
+    def _iter_block(self, block, start=0):
+        """Декодирует слова блока (в байтах), начиная с позиции start внутри блока"""
+        end = min(self.block_size, self.count - block * self.block_size)
+        pos = self.data_start + self.offsets[block]
+        length, pos = read_varint(self.mm, pos)
+        word = self.mm[pos:pos + length]
+        pos += length
+        for index in range(end):
+            if index:
+                shared, pos = read_varint(self.mm, pos)
+                length, pos = read_varint(self.mm, pos)
+                word = word[:shared] + self.mm[pos:pos + length]
+                pos += length
+            if index >= start:
+                yield word
+
+    def _find_block(self, key):
+        """Последний блок, чьё первое слово <= key (или 0)"""
+        lo, hi = 0, self.block_count
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if self._block_first(mid) <= key:
+                lo = mid + 1
+            else:
+                hi = mid
+        return max(0, lo - 1)
+
+    def lower_bound(self, word):
+        """Индекс первого слова, не меньшего word"""
+        key = word.encode('utf-8') if isinstance(word, str) else word
+        if not self.count:
+            return 0
+        block = self._find_block(key)
+        index = block * self.block_size
+        for candidate in self._iter_block(block):
+            if candidate >= key:
+                return index
+            index += 1
+        return index
+
+    def __contains__(self, word):
+        key = word.encode('utf-8')
+        if not self.count:
+            return False
+        for candidate in self._iter_block(self._find_block(key)):
+            if candidate >= key:
+                return candidate == key
+        return False
+
+    def prefix_range(self, prefix):
+        """Диапазон индексов [lo, hi) слов, начинающихся с prefix"""
+        key = prefix.encode('utf-8')
+        # 0xFF never occurs in UTF-8, so it sorts after every continuation
+        return self.lower_bound(key), self.lower_bound(key + b"\xff")
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            start, stop, step = index.indices(self.count)
+            if step != 1:
+                return [self[i] for i in range(start, stop, step)]
+            return list(self.iter_range(start, stop))
+        if index < 0:
+            index += self.count
+        if not 0 <= index < self.count:
+            raise IndexError(index)
+        block, start = divmod(index, self.block_size)
+        return next(self._iter_block(block, start)).decode('utf-8')
+
+    def iter_range(self, start, stop):
+        block, offset = divmod(start, self.block_size)
+        remaining = stop - start
+        while remaining > 0 and block < self.block_count:
+            for word in self._iter_block(block, offset):
+                yield word.decode('utf-8')
+                remaining -= 1
+                if not remaining:
+                    return
+            block += 1
+            offset = 0
+
+    def __iter__(self):
+        return self.iter_range(0, self.count)
@@ -0,0 +1,126 @@
+import bisect
+import tkinter as tk
+import tkinter.font as tkfont
+
+
+class DictionaryView(tk.Frame):
+    """Список слов, который показывает только видимые строки.
+
+    words — отсортированная последовательность (например, WordStore.snapshot()).
+    В Listbox всегда лежит лишь одно окно строк; полоса прокрутки и колесо мыши
+    сдвигают это окно по индексу. Поиск по префиксу сужает диапазон
+    двоичным поиском, а при дописывании префикса ищет внутри прежнего диапазона.
+    Если у words есть prefix_range (CompactDictionary, SortedOverlay),
+    диапазон ищется им: так не декодируется блок на каждом шаге bisect.
+    """
+
+    def __init__(self, master, words, theme, font=("Helvetica", 12)):
+        super().__init__(master, bg=theme['bg'])
+        self.words = words
+        self.lo = 0
+        self.hi = len(words)
+        self.top = 0
+        self.rows = 15
+        self.prefix = ""
+        self.line_height = tkfont.Font(font=font).metrics('linespace') + 2
+
+        self.search_var = tk.StringVar()
+        self.search_entry = tk.Entry(self,
+                                     textvariable=self.search_var,
+                                     bg=theme['entry_bg'],
+                                     fg=theme['fg'],
+                                     insertbackground=theme['fg'])
+        self.search_entry.pack(fill=tk.X, padx=5, pady=5)
+
+        self.scrollbar = tk.Scrollbar(self, command=self.on_scrollbar, bg=theme['button_bg'])
+        self.scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
+
+        self.listbox = tk.Listbox(self,
+                                  font=font,
+                                  width=40,
+                                  height=self.rows,
+                                  activestyle="none",
+                                  bg=theme['listbox_bg'],
+                                  fg=theme['fg'],
+                                  selectbackground=theme['highlight'])
+        self.listbox.pack(fill=tk.BOTH, expand=True)
+
+        self.search_var.trace_add('write', lambda *args: self.set_prefix(self.search_var.get()))
+        self.listbox.bind("<Configure>", self.on_resize)
+        self.listbox.bind("<MouseWheel>", self.on_mousewheel)
+        self.listbox.bind("<Button-4>", lambda event: self.scroll_by(-3))
+        self.listbox.bind("<Button-5>", lambda event: self.scroll_by(3))
+        self.render()
+
+    def set_prefix(self, prefix):
+        prefix = prefix.strip().lower()
+        prefix_range = getattr(self.words, 'prefix_range', None)
+        if prefix_range is not None:
+            self.prefix = prefix
+            self.lo, self.hi = prefix_range(prefix)
+            self.top = 0
+            self.render()
+            return
+        if prefix.startswith(self.prefix) and self.prefix:
+            lo, hi = self.lo, self.hi
+        else:
+            lo, hi = 0, len(self.words)
+        self.prefix = prefix
+        self.lo = bisect.bisect_left(self.words, prefix, lo, hi)
+        self.hi = bisect.bisect_left(self.words, prefix + "\uffff", self.lo, hi) if prefix else hi
+        self.top = 0
+        self.render()
+
+    def set_words(self, words):
+        """Подменяет список слов, сохраняя поиск и, по возможности, прокрутку"""
+        top = self.top
+        self.words = words
+        prefix, self.prefix = self.prefix, ""
+        self.lo, self.hi = 0, len(words)
+        if prefix:
+            self.set_prefix(prefix)
+        self.top = top
+        self.render()
+
+    def render(self):
+        # The backing list may grow while the window is open
+        if not self.prefix:
+            self.hi = len(self.words)
+        total = self.hi - self.lo
+        self.top = max(0, min(self.top, total - self.rows))
+        start = self.lo + self.top
+        visible = self.words[start:min(start + self.rows, self.hi)]
+
+        self.listbox.delete(0, tk.END)
+        if visible:
+            self.listbox.insert(tk.END, *[word.capitalize() for word in visible])
+        elif not self.prefix:
+            self.listbox.insert(tk.END, "Словарь пуст")
+        else:
+            self.listbox.insert(tk.END, "Ничего не найдено")
+
+        if total:
+            self.scrollbar.set(self.top / total, min(1.0, (self.top + self.rows) / total))
+        else:
+            self.scrollbar.set(0.0, 1.0)
+
+    def scroll_by(self, rows):
+        self.top += rows
+        self.render()
+
+    def on_scrollbar(self, action, amount, unit=None):
+        if action == "moveto":
+            self.top = int(float(amount) * (self.hi - self.lo))
+            self.render()
+        elif action == "scroll":
+            step = self.rows if unit == "pages" else 1
+            self.scroll_by(int(amount) * step)
+
+    def on_mousewheel(self, event):
+        self.scroll_by(-3 if event.delta > 0 else 3)
+
+    def on_resize(self, event):
+        rows = max(1, event.height // self.line_height)
+        if rows != self.rows:
+            self.rows = rows
+            self.render()
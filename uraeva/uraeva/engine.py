@@ -0,0 +1,128 @@
+import time
+
+from grid import Selection
+from solver import letter_bit
+
+
+class GameState:
+    """Состояние одной игры"""
+
+    __slots__ = ('letters', 'rows', 'cols', 'selection', 'score', 'checked_words',
+                 'lemmas', 'forms', 'running', 'start_time', 'elapsed', 'duration',
+                 'letter_cells')
+
+    def __init__(self, letters):
+        self.letters = letters
+        self.rows = len(letters)
+        self.cols = len(letters[0]) if letters else 0
+        self.selection = Selection(self.cols)
+        self.score = 0
+        # Lemmas of the accepted words in order, the same as a set, and the forms
+        self.checked_words = []
+        self.lemmas = set()
+        self.forms = set()
+        self.running = False
+        self.start_time = None
+        self.elapsed = 0.0
+        self.duration = None
+        # Cells grouped by letter bit, to match them against trie masks
+        self.letter_cells = {}
+        for i, row in enumerate(letters):
+            for j, letter in enumerate(row):
+                self.letter_cells.setdefault(letter_bit(letter.lower()), []).append((i, j))
+
+
+class GameEngine:
+    """Логика игры без интерфейса: выбор клеток, проверка слов, очки и время.
+
+    validator(word) используется в submit_word и возвращает лемму (или True)
+    для верного слова и None/False для неверного; интерфейс, который
+    проверяет слова асинхронно, вместо этого вызывает take_word и apply_verdict.
+
+    Слова учитываются по леммам: та же форма второй раз не засчитывается,
+    а другая форма уже названного слова — только если reject_inflected выключен.
+    """
+
+    def __init__(self, letters, validator=None, clock=time.monotonic, reject_inflected=False):
+        self.validator = validator
+        self.clock = clock
+        self.reject_inflected = reject_inflected
+        self.state = GameState(letters)
+
+    def start(self, letters=None, duration=None):
+        """Начинает новую игру (на новой сетке, если она передана).
+
+        duration — длина раунда в секундах, None — без ограничения.
+        """
+        self.state = GameState(letters if letters is not None else self.state.letters)
+        self.state.duration = duration
+        self.state.running = True
+        self.state.start_time = self.clock()
+
+    def end(self):
+        """Завершает игру и возвращает набранные очки"""
+        self.tick()
+        self.state.running = False
+        return self.state.score
+
+    def tick(self, now=None):
+        """Обновляет прошедшее время и возвращает его в секундах"""
+        state = self.state
+        if state.running:
+            state.elapsed = (self.clock() if now is None else now) - state.start_time
+        return state.elapsed
+
+    def select_cell(self, i, j):
+        """Выбирает клетку; возвращает False, если она уже выбрана"""
+        return self.state.selection.add(i, j)
+
+    def selected_letters(self):
+        letters = self.state.letters
+        return [letters[i][j] for i, j in self.state.selection]
+
+    def current_word(self):
+        return "".join(self.selected_letters())
+
+    def extending_cells(self, next_letters):
+        """Невыбранные клетки с буквами из маски next_letters (см. Trie.next_letters)"""
+        state = self.state
+        return [cell for bit, cells in state.letter_cells.items() if next_letters & bit
+                for cell in cells if cell not in state.selection]
+
+    def take_word(self):
+        """Забирает набранное слово (в нижнем регистре) и сбрасывает выбор"""
+        word = self.current_word().lower()
+        self.state.selection.clear()
+        return word
+
+    def is_repeat(self, word, lemma=None):
+        """Было ли слово (или, при reject_inflected, другая его форма) уже засчитано"""
+        state = self.state
+        return word in state.forms or (self.reject_inflected and (lemma or word) in state.lemmas)
+
+    def apply_verdict(self, word, is_valid, lemma=None):
+        """Начисляет очки за проверенное слово; возвращает число очков.
+
+        lemma — начальная форма слова (по умолчанию само слово).
+        За повтор (см. is_repeat) очков нет.
+        """
+        if not is_valid or self.is_repeat(word, lemma):
+            return 0
+        state = self.state
+        lemma = lemma or word
+        points = len(word)
+        state.score += points
+        state.forms.add(word)
+        if lemma not in state.lemmas:
+            state.lemmas.add(lemma)
+            state.checked_words.append(lemma)
+        return points
+
+    def submit_word(self):
+        """Проверяет набранное слово через validator; возвращает (слово, очки) или None"""
+        word = self.take_word()
+        if not word:
+            return None
+        verdict = self.validator(word)
+        lemma = verdict if isinstance(verdict, str) else None
+        return word, self.apply_verdict(word, bool(verdict), lemma)
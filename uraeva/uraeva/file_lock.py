@@ -0,0 +1,102 @@
+"""Межпроцессная блокировка для файлов, общих для нескольких копий игры."""
+import os
+import time
+
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
+
+try:
+    import msvcrt
+except ImportError:
+    msvcrt = None
+
+
+class FileLock:
+    """Эксклюзивная блокировка на отдельном файле-замке path.
+
+    Используется fcntl.flock (POSIX) или msvcrt.locking (Windows); если нет
+    ни того, ни другого, замком служит сам файл, создаваемый с O_EXCL.
+    Блокировка повторно входимая в пределах одного объекта, так что метод,
+    взявший её, может вызывать другие методы, которые тоже её берут.
+    Объект не делится между потоками.
+    """
+
+    def __init__(self, path, timeout=10.0, poll=0.01):
+        self.path = path
+        self.timeout = timeout
+        self.poll = poll
+        self.fd = None
+        self.depth = 0
+
+    def acquire(self):
+        if self.depth:
+            self.depth += 1
+            return
+        deadline = time.monotonic() + self.timeout
+        if fcntl is not None:
+            self.fd = os.open(self.path, os.O_RDWR | os.O_CREAT, 0o644)
+            while True:
+                try:
+                    fcntl.flock(self.fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+                    break
+                except BlockingIOError:
+                    self._wait(deadline)
+        elif msvcrt is not None:
+            self.fd = os.open(self.path, os.O_RDWR | os.O_CREAT, 0o644)
+            while True:
+                try:
+                    msvcrt.locking(self.fd, msvcrt.LK_NBLCK, 1)
+                    break
+                except OSError:
+                    self._wait(deadline)
+        else:
+            while True:
+                try:
+                    self.fd = os.open(self.path, os.O_RDWR | os.O_CREAT | os.O_EXCL, 0o644)
+                    break
+                except FileExistsError:
+                    self._break_stale()
+                    self._wait(deadline)
+        self.depth = 1
+
+    def _wait(self, deadline):
+        if time.monotonic() >= deadline:
+            if self.fd is not None:
+                os.close(self.fd)
+                self.fd = None
+            raise TimeoutError(f"не удалось заблокировать {self.path}")
+        time.sleep(self.poll)
+
+    def _break_stale(self):
+        # A lock file left behind by a crashed process is removed after timeout
+        try:
+            if time.time() - os.path.getmtime(self.path) > self.timeout:
+                os.remove(self.path)
+        except OSError:
+            pass
+
+    def release(self):
+        self.depth -= 1
+        if self.depth:
+            return
+        fd, self.fd = self.fd, None
+        if fcntl is not None:
+            fcntl.flock(fd, fcntl.LOCK_UN)
+            os.close(fd)
+        elif msvcrt is not None:
+            os.lseek(fd, 0, os.SEEK_SET)
+            msvcrt.locking(fd, msvcrt.LK_UNLCK, 1)
+            os.close(fd)
+        else:
+            os.close(fd)
+            os.remove(self.path)
+
+    def __enter__(self):
+        self.acquire()
+        return self
+
+    def __exit__(self, *exc):
+        self.release()
+        return False
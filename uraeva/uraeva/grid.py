@@ -0,0 +1,88 @@
+import random
+
+from solver import solve
+
+# Approximate frequencies of Russian letters in text, per cent
+LETTER_FREQUENCIES = {
+    'О': 10.97, 'Е': 8.45, 'А': 8.01, 'И': 7.35, 'Н': 6.70, 'Т': 6.26,
+    'С': 5.47, 'Р': 4.73, 'В': 4.54, 'Л': 4.40, 'К': 3.49, 'М': 3.21,
+    'Д': 2.98, 'П': 2.81, 'У': 2.62, 'Я': 2.01, 'Ы': 1.90, 'Ь': 1.74,
+    'Г': 1.70, 'З': 1.65, 'Б': 1.59, 'Ч': 1.44, 'Й': 1.21, 'Х': 0.97,
+    'Ж': 0.94, 'Ш': 0.73, 'Ю': 0.64, 'Ц': 0.48, 'Щ': 0.36, 'Э': 0.32,
+    'Ф': 0.26, 'Ъ': 0.04,
+}
+
+DEFAULT_LETTERS = [
+    ['А', 'Б', 'В', 'Г', 'Д', 'Е'],
+    ['Ж', 'З', 'И', 'Й', 'К', 'Л'],
+    ['М', 'Н', 'О', 'П', 'Р', 'С'],
+    ['Т', 'У', 'Ф', 'Х', 'Ц', 'Ч'],
+    ['Ш', 'Щ', 'Ы', 'Э', 'Ю', 'Я']
+]
+
+
+def generate_letters(rows, cols, rng, weights=None):
+    """Случайная сетка rows x cols с буквами, взвешенными по частоте"""
+    weights = weights or LETTER_FREQUENCIES
+    alphabet = list(weights)
+    cum_weights = []
+    total = 0
+    for letter in alphabet:
+        total += weights[letter]
+        cum_weights.append(total)
+    flat = rng.choices(alphabet, cum_weights=cum_weights, k=rows * cols)
+    return [flat[i * cols:(i + 1) * cols] for i in range(rows)]
+
+
+def generate_grid(rows, cols, seed=None, trie=None, min_words=0, attempts=50, weights=None):
+    """Генерирует сетку, в которой можно составить не меньше min_words слов.
+
+    Если за attempts попыток такой сетки не нашлось (например, словарь слишком мал),
+    возвращается сетка с наибольшим числом слов. Возвращает (буквы, решения).
+    """
+    rng = random.Random(seed)
+    best_letters, best_words = None, []
+    for _ in range(max(1, attempts)):
+        letters = generate_letters(rows, cols, rng, weights)
+        if trie is None:
+            return letters, []
+        words = solve(trie, letters)
+        if best_letters is None or len(words) > len(best_words):
+            best_letters, best_words = letters, words
+        if len(words) >= min_words:
+            break
+    return best_letters, best_words
+
+
+class Selection:
+    """Выбранные клетки в порядке нажатия; принадлежность проверяется по битовой маске"""
+
+    def __init__(self, cols):
+        self.cols = cols
+        self.cells = []
+        self.mask = 0
+
+    def bit(self, i, j):
+        return 1 << (i * self.cols + j)
+
+    def __contains__(self, cell):
+        return bool(self.mask & self.bit(*cell))
+
+    def __len__(self):
+        return len(self.cells)
+
+    def __iter__(self):
+        return iter(self.cells)
+
+    def add(self, i, j):
+        """Добавляет клетку; возвращает False, если она уже выбрана"""
+        bit = self.bit(i, j)
+        if self.mask & bit:
+            return False
+        self.mask |= bit
+        self.cells.append((i, j))
+        return True
+
+    def clear(self):
+        self.cells = []
+        self.mask = 0
@@ -0,0 +1,102 @@
+import sqlite3
+import time
+
+
+class ScoreStore:
+    """Таблица рекордов в SQLite.
+
+    Результаты копятся в памяти и записываются одной транзакцией в flush().
+    Страницы топа выбираются по ключу последней строки, а не через OFFSET,
+    поэтому дальние страницы открываются так же быстро, как первая.
+    Место игрока считается по таблице score_counts (сколько результатов
+    набрали каждое число очков), которую триггеры обновляют при вставке,
+    так что запрос проходит по различным значениям очков, а не по строкам.
+    """
+
+    def __init__(self, path="рекорды.db"):
+        self.path = path
+        self.pending = []
+        self.conn = sqlite3.connect(path, check_same_thread=False)
+        self.conn.executescript("""
+            PRAGMA journal_mode=WAL;
+            CREATE TABLE IF NOT EXISTS scores (
+                id INTEGER PRIMARY KEY,
+                user TEXT NOT NULL,
+                score INTEGER NOT NULL,
+                created_at REAL NOT NULL
+            );
+            CREATE INDEX IF NOT EXISTS scores_by_score ON scores(score DESC, created_at, id);
+            CREATE INDEX IF NOT EXISTS scores_by_time ON scores(created_at);
+            CREATE INDEX IF NOT EXISTS scores_by_user ON scores(user, score DESC);
+            CREATE TABLE IF NOT EXISTS score_counts (
+                score INTEGER PRIMARY KEY,
+                count INTEGER NOT NULL
+            );
+        """)
+        with self.conn:
+            exists = self.conn.execute(
+                "SELECT 1 FROM sqlite_master WHERE type = 'trigger' AND name = 'scores_count_insert'"
+            ).fetchone()
+            if not exists:
+                # Databases from before score_counts are counted once here
+                self.conn.executescript("""
+                    DELETE FROM score_counts;
+                    INSERT INTO score_counts (score, count)
+                        SELECT score, COUNT(*) FROM scores GROUP BY score;
+                    CREATE TRIGGER scores_count_insert AFTER INSERT ON scores BEGIN
+                        INSERT INTO score_counts (score, count) VALUES (NEW.score, 1)
+                            ON CONFLICT(score) DO UPDATE SET count = count + 1;
+                    END;
+                    CREATE TRIGGER scores_count_delete AFTER DELETE ON scores BEGIN
+                        UPDATE score_counts SET count = count - 1 WHERE score = OLD.score;
+                    END;
+                """)
+
+    def record(self, user, score, created_at=None):
+        """Запоминает результат игры до следующего flush()"""
+        self.pending.append((user, score, created_at if created_at is not None else time.time()))
+
+    def flush(self):
+        if not self.pending:
+            return
+        with self.conn:
+            self.conn.executemany(
+                "INSERT INTO scores (user, score, created_at) VALUES (?, ?, ?)", self.pending
+            )
+        self.pending = []
+
+    def top(self, limit=50, after=None):
+        """Страница лучших результатов: список (user, score, created_at, id).
+
+        after — последняя строка предыдущей страницы.
+        """
+        if after is None:
+            return self.conn.execute(
+                "SELECT user, score, created_at, id FROM scores "
+                "ORDER BY score DESC, created_at, id LIMIT ?", (limit,)
+            ).fetchall()
+        _, score, created_at, row_id = after
+        return self.conn.execute(
+            "SELECT user, score, created_at, id FROM scores "
+            "WHERE score <= ? AND (score < ? OR created_at > ? OR (created_at = ? AND id > ?)) "
+            "ORDER BY score DESC, created_at, id LIMIT ?",
+            (score, score, created_at, created_at, row_id, limit)
+        ).fetchall()
+
+    def best(self, user):
+        row = self.conn.execute("SELECT MAX(score) FROM scores WHERE user = ?", (user,)).fetchone()
+        return row[0]
+
+    def rank(self, user):
+        """Место лучшего результата игрока (1 — первое) или None, если игр не было"""
+        best = self.best(user)
+        if best is None:
+            return None
+        row = self.conn.execute(
+            "SELECT COALESCE(SUM(count), 0) FROM score_counts WHERE score > ?", (best,)
+        ).fetchone()
+        return row[0] + 1
+
+    def close(self):
+        self.flush()
+        self.conn.close()
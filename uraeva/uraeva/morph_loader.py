@@ -0,0 +1,93 @@
+import threading
+import time
+from concurrent.futures import Future
+
+from solver import ALPHABET, letter_bit
+
+# The analyzer accepts "е" for "ё", so a grid cell with Е also stands for Ё
+SUBSTITUTES = {'е': 'её'}
+
+
+class MorphLoader:
+    """Создаёт MorphAnalyzer в фоновом потоке, чтобы не задерживать открытие окна"""
+
+    def __init__(self):
+        self.future = Future()
+        self.load_time = None
+        self.thread = threading.Thread(target=self._load, name="morph-loader", daemon=True)
+
+    def start(self):
+        self.thread.start()
+        return self
+
+    def _load(self):
+        start = time.perf_counter()
+        try:
+            # Importing pymorphy3 is itself slow, so it happens here too
+            from pymorphy3 import MorphAnalyzer
+            morph = MorphAnalyzer()
+        except Exception as e:
+            self.future.set_exception(e)
+            return
+        self.load_time = time.perf_counter() - start
+        self.future.set_result(morph)
+
+    def ready(self):
+        return self.future.done()
+
+    def get(self, timeout=None):
+        """Возвращает анализатор, при необходимости дожидаясь окончания загрузки"""
+        return self.future.result(timeout)
+
+
+def analyze(morph, word):
+    """Возвращает начальную форму слова или None, если слово не распознано.
+
+    Слова, которых нет в словаре анализатора, отклоняются: для них parse
+    только угадывает разбор по окончанию.
+    """
+    if not morph.word_is_known(word):
+        return None
+    parsed = morph.parse(word)
+    if parsed[0].score >= 0.5 and parsed[0].tag.POS is not None:
+        return parsed[0].normal_form
+    return None
+
+
+class FormPrefixes:
+    """Начала словоформ по словарю анализатора (morph.dictionary.words).
+
+    Префиксное дерево игры хранит только леммы, а засчитываются и другие
+    формы слова («столы»), поэтому о том, как можно продолжить набранное
+    начало, спрашивается DAWG всех словоформ pymorphy. Интерфейс тот же,
+    что у solver.Trie.next_letters.
+    """
+
+    def __init__(self, morph):
+        self.dct = morph.dictionary.words.dct
+
+    def _follow(self, prefix):
+        """Узлы DAWG для всех написаний prefix (е или ё)"""
+        indices = [self.dct.ROOT]
+        for ch in prefix:
+            indices = [index for index in
+                       (self.dct.follow_bytes(variant.encode('utf-8'), index)
+                        for index in indices for variant in SUBSTITUTES.get(ch, ch))
+                       if index is not None]
+            if not indices:
+                break
+        return indices
+
+    def next_letters(self, prefix):
+        """Маска букв, продолжающих префикс; None, если словоформ с таким началом нет"""
+        indices = self._follow(prefix)
+        if not indices:
+            return None
+        mask = 0
+        for ch in ALPHABET:
+            encoded = ch.encode('utf-8')
+            if any(self.dct.follow_bytes(encoded, index) is not None for index in indices):
+                mask |= letter_bit(ch)
+                if ch == 'ё':
+                    mask |= letter_bit('е')
+        return mask
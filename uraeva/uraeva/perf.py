@@ -0,0 +1,135 @@
+"""Замеры горячих путей: счётчики и гистограммы длительностей.
+
+Пока замеры выключены, metrics.span() возвращает один и тот же пустой
+объект и ничего не записывает, так что стоимость — один вызов функции.
+Включённые замеры пишутся событиями в JSONL-файл (если он задан).
+"""
+import json
+import threading
+import time
+from collections import deque
+
+
+class _NullSpan:
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+NULL_SPAN = _NullSpan()
+
+
+class _Span:
+    __slots__ = ('metrics', 'name', 'start')
+
+    def __init__(self, metrics, name):
+        self.metrics = metrics
+        self.name = name
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.metrics.observe(self.name, time.perf_counter() - self.start)
+        return False
+
+
+class Histogram:
+    """Число, сумма и последние samples значений для подсчёта перцентилей"""
+
+    def __init__(self, samples=10000):
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+        self.values = deque(maxlen=samples)
+
+    def add(self, value):
+        self.count += 1
+        self.total += value
+        self.max = max(self.max, value)
+        self.values.append(value)
+
+    def percentile(self, p):
+        if not self.values:
+            return 0.0
+        ordered = sorted(self.values)
+        return ordered[min(len(ordered) - 1, int(p / 100 * len(ordered)))]
+
+    def summary(self):
+        return {
+            'count': self.count,
+            'mean_ms': self.total / self.count * 1000 if self.count else 0.0,
+            'p50_ms': self.percentile(50) * 1000,
+            'p99_ms': self.percentile(99) * 1000,
+            'max_ms': self.max * 1000,
+        }
+
+
+class Metrics:
+    def __init__(self):
+        self.enabled = False
+        self.path = None
+        self.counters = {}
+        self.histograms = {}
+        self.buffer = []
+        self.lock = threading.Lock()
+
+    def enable(self, path=None):
+        self.path = path or self.path
+        self.enabled = True
+
+    def disable(self):
+        self.flush()
+        self.enabled = False
+
+    def span(self, name):
+        """Контекстный менеджер, замеряющий время блока под именем name"""
+        if not self.enabled:
+            return NULL_SPAN
+        return _Span(self, name)
+
+    def count(self, name, n=1):
+        if not self.enabled:
+            return
+        with self.lock:
+            self.counters[name] = self.counters.get(name, 0) + n
+
+    def observe(self, name, seconds):
+        if not self.enabled:
+            return
+        with self.lock:
+            histogram = self.histograms.get(name)
+            if histogram is None:
+                histogram = self.histograms[name] = Histogram()
+            histogram.add(seconds)
+            if self.path:
+                self.buffer.append({'t': time.time(), 'span': name, 'ms': seconds * 1000})
+                if len(self.buffer) >= 256:
+                    self._write(self.buffer)
+                    self.buffer = []
+
+    def snapshot(self):
+        with self.lock:
+            return {
+                'counters': dict(self.counters),
+                'histograms': {name: h.summary() for name, h in self.histograms.items()},
+            }
+
+    def _write(self, records):
+        with open(self.path, 'a', encoding='utf-8') as f:
+            f.writelines(json.dumps(record, ensure_ascii=False) + "\n" for record in records)
+
+    def flush(self):
+        """Дописывает накопленные события и итоговую сводку в JSONL-файл"""
+        if not self.path or not self.enabled:
+            return
+        summary = dict(self.snapshot(), t=time.time(), summary=True)
+        with self.lock:
+            records, self.buffer = self.buffer, []
+        self._write(records + [summary])
+
+
+metrics = Metrics()
@@ -0,0 +1,291 @@
+"""Журнал повторов: все действия сессии в компактном двоичном виде.
+
+Файл пишется только дописыванием: MAGIC, затем записи
+
+    varint тип, varint миллисекунды с предыдущей записи, поля по схеме SCHEMA
+
+Строки — varint длина и байты UTF-8, числа — varint (см. compact_dict).
+Оборванная последняя запись (например, после падения) при чтении
+пропускается.
+
+Проигрыватель прогоняет записанные игры через GameEngine без пауз и
+сверяет слова, очки и время с записанными — для отладки и проверки
+результатов на честность.
+
+Пример:
+    python replay.py повторы/20261017-120000-4242.replay [--check]
+"""
+import argparse
+import os
+import queue
+import threading
+import time
+
+from compact_dict import read_varint, write_varint
+from engine import GameEngine
+
+MAGIC = b"URREPL1\0"
+
+START, SELECT, SUBMIT, VERDICT, END = range(1, 6)
+NAMES = {START: 'start', SELECT: 'select', SUBMIT: 'submit', VERDICT: 'verdict', END: 'end'}
+
+# START: player, grid, round length in seconds (0 — untimed), reject_inflected (0/1)
+# VERDICT: word, lemma ("" — rejected), points
+SCHEMA = {
+    START: ('str', 'grid', 'uint', 'uint'),
+    SELECT: ('uint', 'uint'),
+    SUBMIT: ('str',),
+    VERDICT: ('str', 'str', 'uint'),
+    END: ('uint',),
+}
+
+
+def _write_str(out, text):
+    data = text.encode('utf-8')
+    write_varint(out, len(data))
+    out += data
+
+
+def _read_str(buf, pos):
+    length, pos = read_varint(buf, pos)
+    if pos + length > len(buf):
+        raise IndexError("обрыв строки")
+    return bytes(buf[pos:pos + length]).decode('utf-8'), pos + length
+
+
+def encode_record(out, kind, delta_ms, fields):
+    write_varint(out, kind)
+    write_varint(out, delta_ms)
+    for field_type, value in zip(SCHEMA[kind], fields):
+        if field_type == 'uint':
+            write_varint(out, value)
+        elif field_type == 'str':
+            _write_str(out, value)
+        else:
+            write_varint(out, len(value))
+            for row in value:
+                _write_str(out, "".join(row))
+
+
+def decode_records(buf):
+    """Отдаёт записи (тип, время в мс от начала сессии, поля)"""
+    if bytes(buf[:len(MAGIC)]) != MAGIC:
+        raise ValueError("это не файл повтора")
+    pos = len(MAGIC)
+    t = 0
+    while pos < len(buf):
+        try:
+            kind, p = read_varint(buf, pos)
+            delta, p = read_varint(buf, p)
+            fields = []
+            for field_type in SCHEMA[kind]:
+                if field_type == 'uint':
+                    value, p = read_varint(buf, p)
+                elif field_type == 'str':
+                    value, p = _read_str(buf, p)
+                else:
+                    rows, p = read_varint(buf, p)
+                    value = []
+                    for _ in range(rows):
+                        row, p = _read_str(buf, p)
+                        value.append(list(row))
+                fields.append(value)
+        except (IndexError, KeyError, UnicodeDecodeError):
+            # A record cut short by a crash ends the log
+            return
+        pos = p
+        t += delta
+        yield kind, t, fields
+
+
+def read_replay(path):
+    with open(path, 'rb') as f:
+        return list(decode_records(f.read()))
+
+
+class ReplayWriter:
+    """Буферизованная запись журнала из фонового потока.
+
+    record() только кодирует запись в буфер в памяти; полные пачки
+    (и всё, что накопилось к flush) дописывает в файл отдельный поток,
+    так что обработчики нажатий не ждут диска. Файл создаётся при первой
+    записи: сессия без событий не оставляет пустого файла.
+    """
+
+    def __init__(self, path, clock=time.monotonic, flush_bytes=4096):
+        self.path = path
+        self.clock = clock
+        self.flush_bytes = flush_bytes
+        self.last = clock()
+        self.buffer = bytearray()
+        self.queue = queue.Queue()
+        self.thread = threading.Thread(target=self._run, name="replay-writer", daemon=True)
+        self.thread.start()
+
+    def record(self, kind, *fields):
+        now = self.clock()
+        delta_ms = max(0, round((now - self.last) * 1000))
+        # Keep the remainder so rounding does not drift over a long session
+        self.last += delta_ms / 1000
+        encode_record(self.buffer, kind, delta_ms, fields)
+        if len(self.buffer) >= self.flush_bytes:
+            self.flush()
+
+    def flush(self):
+        if self.buffer:
+            self.queue.put(bytes(self.buffer))
+            self.buffer.clear()
+
+    def close(self):
+        self.flush()
+        self.queue.put(None)
+        self.thread.join()
+
+    def _run(self):
+        f = None
+        try:
+            while True:
+                data = self.queue.get()
+                if data is None:
+                    return
+                if f is None:
+                    f = self._open()
+                f.write(data)
+                f.flush()
+        finally:
+            if f is not None:
+                f.close()
+
+    def _open(self):
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        f = open(self.path, 'ab')
+        if f.tell() == 0:
+            f.write(MAGIC)
+        return f
+
+
+def session_path(directory="повторы"):
+    """Имя файла для новой сессии"""
+    return os.path.join(directory, time.strftime("%Y%m%d-%H%M%S") + f"-{os.getpid()}.replay")
+
+
+class GameAudit:
+    """Итог проверки одной игры из журнала"""
+
+    def __init__(self, player, letters, duration):
+        self.player = player
+        self.letters = letters
+        self.duration = duration
+        self.recorded_score = None
+        self.score = 0
+        self.words = 0
+        self.problems = []
+
+    @property
+    def ok(self):
+        return not self.problems and self.recorded_score in (None, self.score)
+
+
+def replay(records, check=None):
+    """Прогоняет записанные игры через GameEngine; возвращает список GameAudit.
+
+    check(word) -> лемма или "" — если задан, принятые слова проверяются заново.
+    """
+    now = [0.0]
+    engine = None
+    audits = []
+    audit = None
+    started = 0
+    submitted = {}
+    for kind, t, fields in records:
+        now[0] = t / 1000
+        if kind == START:
+            player, letters, duration, reject_inflected = fields
+            engine = GameEngine([], clock=lambda: now[0], reject_inflected=bool(reject_inflected))
+            engine.start(letters, duration or None)
+            audit = GameAudit(player, letters, duration or None)
+            audits.append(audit)
+            started = t
+            submitted = {}
+            continue
+        if audit is None:
+            continue
+        if kind == SELECT:
+            i, j = fields
+            if not (0 <= i < engine.state.rows and 0 <= j < engine.state.cols):
+                audit.problems.append(f"{t} мс: клетка ({i}, {j}) вне сетки")
+            elif not engine.select_cell(i, j):
+                audit.problems.append(f"{t} мс: клетка ({i}, {j}) выбрана повторно")
+        elif kind == SUBMIT:
+            word = engine.take_word()
+            if word != fields[0]:
+                audit.problems.append(f"{t} мс: отправлено «{fields[0]}», а выбрано «{word}»")
+            submitted.setdefault(fields[0], []).append(t)
+        elif kind == VERDICT:
+            word, lemma, points = fields
+            if not submitted.get(word):
+                audit.problems.append(f"{t} мс: вердикт для неотправленного «{word}»")
+                continue
+            # The verdict may come later than the word was sent; the send time counts
+            sent = submitted[word].pop(0)
+            if check is not None and lemma and check(word) != lemma:
+                audit.problems.append(f"{t} мс: «{word}» принято как «{lemma}», "
+                                      f"а проверка даёт «{check(word)}»")
+            expected = engine.apply_verdict(word, bool(lemma), lemma or None)
+            if expected != points:
+                audit.problems.append(f"{t} мс: за «{word}» записано {points} очков, "
+                                      f"а по правилам {expected}")
+            if expected and audit.duration is not None and sent - started > audit.duration * 1000:
+                audit.problems.append(f"{sent} мс: «{word}» отправлено после конца раунда")
+            audit.words += expected > 0
+        elif kind == END:
+            audit.recorded_score = fields[0]
+            audit.score = engine.end()
+            audit = None
+    if audit is not None:
+        audit.score = engine.end()
+    return audits
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Проигрывание и проверка журнала повторов")
+    parser.add_argument("path", help="файл .replay")
+    parser.add_argument("--check", action="store_true",
+                        help="заново проверить слова через pymorphy3 и кэш проверок")
+    parser.add_argument("--cache", default="проверки.cache", help="кэш проверок для --check")
+    parser.add_argument("--verbose", action="store_true", help="печатать все записи")
+    args = parser.parse_args(argv)
+
+    records = read_replay(args.path)
+    if args.verbose:
+        for kind, t, fields in records:
+            print(f"{t / 1000:9.3f}  {NAMES[kind]:<8} {fields}")
+
+    check = None
+    if args.check:
+        from morph_loader import MorphLoader, analyze
+        from validation_cache import ValidationCache
+        morph = MorphLoader().start().get()
+        cache = ValidationCache(args.cache)
+        check = lambda word: cache.lookup(word, lambda w: analyze(morph, w))
+
+    start = time.perf_counter()
+    audits = replay(records, check)
+    elapsed = time.perf_counter() - start
+    session = records[-1][1] / 1000 if records else 0.0
+    print(f"Записей: {len(records)}, игр: {len(audits)}, сессия {session:.1f} с "
+          f"проиграна за {elapsed * 1000:.1f} мс")
+    for number, audit in enumerate(audits, 1):
+        recorded = "—" if audit.recorded_score is None else audit.recorded_score
+        status = "ок" if audit.ok else "РАСХОЖДЕНИЯ"
+        print(f"{number:>3}. {audit.player}: записано {recorded}, пересчитано {audit.score} "
+              f"({audit.words} слов) — {status}")
+        for problem in audit.problems:
+            print(f"       {problem}")
+    return 0 if all(audit.ok for audit in audits) else 1
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
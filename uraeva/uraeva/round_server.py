@@ -0,0 +1,435 @@
+"""Сервер соревновательных раундов: все игроки комнаты играют на одной сетке.
+
+Протокол — строки JSON поверх TCP, по сообщению в строке.
+
+    клиент -> сервер
+        {"type": "join", "name": "ник"}
+        {"type": "submit", "word": "слово", "round": 3}
+    сервер -> клиент
+        {"type": "welcome", "id": 17}
+        {"type": "round", "round": 3, "letters": [[...]], "duration": 60, "remaining": 60,
+         "reject_inflected": false}
+        {"type": "tick", "round": 3, "remaining": 59}
+        {"type": "verdict", "word": "слова", "lemma": "слово", "points": 5, "score": 12}
+        {"type": "verdict", "word": "ыы", "points": 0, "reason": "..."}
+        {"type": "scores", "round": 3, "scores": {"ник": 12, ...}}   только изменившиеся
+        {"type": "round_end", "round": 3, "top": [["ник", 12], ...]}
+
+Слова проверяются централизованно через WordService (один прогретый
+анализатор и кэш проверок). Рассылка кодирует сообщение один раз и пишет
+одни и те же байты во все соединения, не дожидаясь медленных клиентов:
+клиент, у которого скопилось слишком много неотправленных данных, отключается.
+Правило о формах уже названных слов (reject_inflected) задаёт сервер и
+сообщает его в начале раунда, чтобы клиент считал очки так же.
+
+Запуск:
+    python round_server.py serve [--port 8766] [--round 60]
+    python round_server.py load --clients 300 --seconds 30
+"""
+import argparse
+import asyncio
+import json
+import queue
+import random
+import socket
+import threading
+import time
+from collections import Counter
+
+from engine import GameEngine
+from grid import generate_grid
+from perf import Histogram, metrics
+from solver import build_trie, fits, solve
+from validation_cache import normalize_word
+from word_service import MAX_WORD, WordService
+from word_store import WordStore
+
+MAX_LINE = 4096
+MAX_BUFFERED = 256 * 1024
+SCORE_PUSH_INTERVAL = 0.25
+
+
+def encode(message):
+    return (json.dumps(message, ensure_ascii=False) + "\n").encode('utf-8')
+
+
+class Player:
+    __slots__ = ('id', 'name', 'writer', 'engine')
+
+    def __init__(self, player_id, name, writer, reject_inflected=False):
+        self.id = player_id
+        self.name = name
+        self.writer = writer
+        self.engine = GameEngine([], reject_inflected=reject_inflected)
+
+
+class RoundServer:
+    """Комната: раунды идут один за другим, между ними пауза"""
+
+    def __init__(self, service, rows=5, cols=6, duration=60, pause=10, seed=None,
+                 min_words=20, reject_inflected=False):
+        self.service = service
+        self.rows = rows
+        self.cols = cols
+        self.duration = duration
+        self.pause = pause
+        self.seed = seed
+        self.min_words = min_words
+        self.reject_inflected = reject_inflected
+        self.players = {}
+        self.next_id = 1
+        self.trie = None
+        self.round_id = 0
+        self.letters = None
+        self.counts = Counter()
+        self.running = False
+        self.deadline = 0.0
+        self.changed = set()
+
+    def broadcast(self, message):
+        data = encode(message)
+        for player in list(self.players.values()):
+            self.send_bytes(player, data)
+
+    def send(self, player, message):
+        self.send_bytes(player, encode(message))
+
+    def send_bytes(self, player, data):
+        transport = player.writer.transport
+        if transport.is_closing():
+            return
+        if transport.get_write_buffer_size() > MAX_BUFFERED:
+            # A client that does not read its messages would hold memory forever
+            metrics.count("room.dropped")
+            transport.abort()
+            return
+        player.writer.write(data)
+
+    def round_message(self):
+        remaining = max(0, round(self.deadline - asyncio.get_running_loop().time()))
+        return {'type': 'round', 'round': self.round_id, 'letters': self.letters,
+                'duration': self.duration, 'remaining': remaining,
+                'reject_inflected': self.reject_inflected}
+
+    def new_letters(self):
+        """Выполняется в рабочем потоке сервиса, которому принадлежит словарь"""
+        if self.trie is None:
+            self.trie = build_trie(self.service.word_store)
+        seed = None if self.seed is None else self.seed + self.round_id
+        letters, _ = generate_grid(self.rows, self.cols, seed, trie=self.trie,
+                                   min_words=self.min_words)
+        return letters
+
+    async def run_rounds(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            letters = await loop.run_in_executor(self.service.executor, self.new_letters)
+            self.round_id += 1
+            self.letters = letters
+            self.counts = Counter(letter.lower() for row in letters for letter in row)
+            start = loop.time()
+            self.deadline = start + self.duration
+            for player in self.players.values():
+                player.engine.start(letters, self.duration)
+            self.running = True
+            self.broadcast(self.round_message())
+
+            # Ticks are scheduled from the round start, so delays do not add up
+            for second in range(1, self.duration + 1):
+                await asyncio.sleep(max(0.0, start + second - loop.time()))
+                if second < self.duration:
+                    self.broadcast({'type': 'tick', 'round': self.round_id,
+                                    'remaining': self.duration - second})
+
+            self.running = False
+            self.push_scores()
+            self.finish_round()
+            await asyncio.sleep(self.pause)
+
+    def finish_round(self):
+        scores = sorted(((player.engine.end(), player.name) for player in self.players.values()),
+                        reverse=True)
+        self.broadcast({'type': 'round_end', 'round': self.round_id,
+                        'top': [[name, score] for score, name in scores[:10]]})
+        for score, name in scores:
+            if score:
+                self.service.score_store.record(name, score)
+        self.service.score_store.flush()
+
+    def push_scores(self):
+        if not self.changed:
+            return
+        scores = {player.name: player.engine.state.score
+                  for player in self.changed if player.id in self.players}
+        self.changed = set()
+        self.broadcast({'type': 'scores', 'round': self.round_id, 'scores': scores})
+
+    async def push_scores_periodically(self):
+        while True:
+            await asyncio.sleep(SCORE_PUSH_INTERVAL)
+            self.push_scores()
+
+    async def submit(self, player, message):
+        word = normalize_word(str(message.get('word', "")))
+        round_id = self.round_id
+        reply = {'type': 'verdict', 'word': word, 'points': 0}
+        if not self.running or message.get('round') != round_id:
+            reply['reason'] = "раунд уже закончился"
+        elif not word or len(word) > MAX_WORD or not fits(word, self.counts):
+            reply['reason'] = "такое слово не составить из этой сетки"
+        elif player.engine.is_repeat(word):
+            reply['reason'] = "это слово уже было"
+        else:
+            start = time.perf_counter()
+            lemma = await self.service.batcher.check(word)
+            metrics.observe("room.check", time.perf_counter() - start)
+            if not self.running or round_id != self.round_id:
+                reply['reason'] = "раунд уже закончился"
+            elif lemma is None:
+                reply['reason'] = "такого слова не существует"
+            elif player.engine.is_repeat(word, lemma):
+                reply['reason'] = f"слово «{lemma}» уже было"
+            else:
+                reply['lemma'] = lemma
+                reply['points'] = player.engine.apply_verdict(word, True, lemma)
+                self.changed.add(player)
+        reply['score'] = player.engine.state.score
+        self.send(player, reply)
+
+    async def handle_connection(self, reader, writer):
+        sock = writer.get_extra_info('socket')
+        if sock is not None:
+            sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        player = None
+        tasks = set()
+        try:
+            while True:
+                line = await reader.readline()
+                if not line:
+                    break
+                try:
+                    message = json.loads(line)
+                except ValueError:
+                    continue
+                if not isinstance(message, dict):
+                    continue
+                kind = message.get('type')
+                if kind == 'join' and player is None:
+                    name = str(message.get('name') or "Игрок")[:32]
+                    player = Player(self.next_id, name, writer, self.reject_inflected)
+                    self.next_id += 1
+                    self.players[player.id] = player
+                    self.send(player, {'type': 'welcome', 'id': player.id})
+                    if self.running:
+                        player.engine.start(self.letters, self.duration)
+                        self.send(player, self.round_message())
+                elif kind == 'submit' and player is not None:
+                    # Checks run concurrently, so one slow word does not hold up the next
+                    task = asyncio.create_task(self.submit(player, message))
+                    tasks.add(task)
+                    task.add_done_callback(tasks.discard)
+        except (ConnectionError, ValueError, asyncio.LimitOverrunError):
+            pass
+        finally:
+            if player is not None:
+                self.players.pop(player.id, None)
+            for task in tasks:
+                task.cancel()
+            writer.close()
+
+    async def serve(self, host="127.0.0.1", port=8766):
+        server = await asyncio.start_server(self.handle_connection, host, port, limit=MAX_LINE,
+                                            backlog=1024)
+        background = [asyncio.create_task(coro) for coro in (
+            self.run_rounds(), self.push_scores_periodically(), self.service.save_periodically())]
+        print(f"Сервер раундов: {host}:{port}")
+        try:
+            async with server:
+                await server.serve_forever()
+        finally:
+            for task in background:
+                task.cancel()
+            self.service.executor.submit(self.service.save).result()
+            self.service.executor.shutdown()
+            self.service.score_store.close()
+
+
+class RoundClient:
+    """Клиент для окна игры: сокет читается в фоновом потоке.
+
+    Сообщения сервера складываются в очередь messages, откуда их забирает
+    главный поток (Tk нельзя трогать из других потоков).
+    """
+
+    def __init__(self, host="127.0.0.1", port=8766, timeout=5.0):
+        self.sock = socket.create_connection((host, port), timeout=timeout)
+        self.sock.settimeout(None)
+        self.sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        self.messages = queue.Queue()
+        self.send_lock = threading.Lock()
+        self.thread = threading.Thread(target=self._read, name="round-client", daemon=True)
+        self.thread.start()
+
+    def _read(self):
+        try:
+            with self.sock.makefile('r', encoding='utf-8') as f:
+                for line in f:
+                    self.messages.put(json.loads(line))
+        except (OSError, ValueError):
+            pass
+        self.messages.put({'type': 'disconnected'})
+
+    def send(self, message):
+        with self.send_lock:
+            self.sock.sendall(encode(message))
+
+    def join(self, name):
+        self.send({'type': 'join', 'name': name})
+
+    def submit(self, word, round_id):
+        self.send({'type': 'submit', 'word': word, 'round': round_id})
+
+    def close(self):
+        try:
+            self.sock.shutdown(socket.SHUT_RDWR)
+        except OSError:
+            pass
+        self.sock.close()
+
+
+class LoadStats:
+    def __init__(self):
+        self.connected = 0
+        self.messages = 0
+        self.verdicts = 0
+        self.accepted = 0
+        self.latency = Histogram(samples=100000)
+
+
+async def bot(host, port, index, trie, stats, rng, interval, accuracy, stop):
+    """Один игрок нагрузочного теста: отправляет слово раз в interval секунд"""
+    reader, writer = await asyncio.open_connection(host, port, limit=1 << 20)
+    stats.connected += 1
+    writer.write(encode({'type': 'join', 'name': f"бот{index}"}))
+    sent = {}
+    state = {'round': None, 'letters': None, 'words': []}
+
+    async def play():
+        while not stop.is_set():
+            await asyncio.sleep(interval * rng.uniform(0.5, 1.5))
+            letters = state['letters']
+            if letters is None:
+                continue
+            if state['words'] and rng.random() < accuracy:
+                word = rng.choice(state['words'])
+            else:
+                flat = [letter.lower() for row in letters for letter in row]
+                word = "".join(rng.sample(flat, rng.randint(2, 6)))
+            sent[word] = time.perf_counter()
+            writer.write(encode({'type': 'submit', 'word': word, 'round': state['round']}))
+
+    player = asyncio.create_task(play())
+    try:
+        while not stop.is_set():
+            line = await reader.readline()
+            if not line:
+                break
+            stats.messages += 1
+            message = json.loads(line)
+            kind = message['type']
+            if kind == 'round':
+                state['round'] = message['round']
+                state['letters'] = message['letters']
+                state['words'] = solve(trie, message['letters']) if trie is not None else []
+            elif kind == 'verdict':
+                stats.verdicts += 1
+                stats.accepted += message['points'] > 0
+                start = sent.pop(message['word'], None)
+                if start is not None:
+                    stats.latency.add(time.perf_counter() - start)
+    finally:
+        player.cancel()
+        writer.close()
+
+
+async def load_test(host, port, clients, seconds, interval, accuracy, dictionary, seed):
+    trie = build_trie(WordStore(dictionary, compiled=True)) if dictionary else None
+    stats = LoadStats()
+    stop = asyncio.Event()
+    rng = random.Random(seed)
+    bots = [asyncio.create_task(bot(host, port, k, trie, stats, random.Random(rng.random()),
+                                    interval, accuracy, stop))
+            for k in range(clients)]
+    start = time.perf_counter()
+    await asyncio.sleep(seconds)
+    stop.set()
+    elapsed = time.perf_counter() - start
+    for task in bots:
+        task.cancel()
+    await asyncio.gather(*bots, return_exceptions=True)
+
+    summary = stats.latency.summary()
+    print(f"Соединений: {stats.connected} из {clients}")
+    print(f"Получено сообщений: {stats.messages} ({stats.messages / elapsed:.0f}/с)")
+    print(f"Ответов на слова: {stats.verdicts} ({stats.verdicts / elapsed:.0f}/с), "
+          f"принято {stats.accepted}")
+    print(f"Задержка ответа: p50 {summary['p50_ms']:.1f} мс, p99 {summary['p99_ms']:.1f} мс, "
+          f"максимум {summary['max_ms']:.1f} мс")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Сервер соревновательных раундов")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    serve = commands.add_parser("serve", help="запустить сервер")
+    serve.add_argument("--host", default="127.0.0.1")
+    serve.add_argument("--port", type=int, default=8766)
+    serve.add_argument("--rows", type=int, default=5)
+    serve.add_argument("--cols", type=int, default=6)
+    serve.add_argument("--seed", type=int, default=None)
+    serve.add_argument("--min-words", type=int, default=20)
+    serve.add_argument("--round", type=int, default=60, help="длина раунда в секундах")
+    serve.add_argument("--pause", type=int, default=10, help="пауза между раундами в секундах")
+    serve.add_argument("--reject-inflected", action="store_true",
+                       help="не засчитывать другую форму уже названного в раунде слова")
+    serve.add_argument("--dictionary", default="словарь.txt", help="слой новых слов этой комнаты")
+    serve.add_argument("--shared", default=None, metavar="PATH",
+                       help="общий словарь только для чтения для всех комнат")
+    serve.add_argument("--cache", default="проверки.cache")
+    serve.add_argument("--scores", default="рекорды.db")
+    serve.add_argument("--perf", nargs="?", const="perf.jsonl", default=None,
+                       help="включить замеры и писать их в JSONL-файл")
+
+    load = commands.add_parser("load", help="нагрузочный тест: много ботов в одной комнате")
+    load.add_argument("--host", default="127.0.0.1")
+    load.add_argument("--port", type=int, default=8766)
+    load.add_argument("--clients", type=int, default=200)
+    load.add_argument("--seconds", type=float, default=30)
+    load.add_argument("--interval", type=float, default=1.0,
+                      help="среднее время между словами одного бота, с")
+    load.add_argument("--accuracy", type=float, default=0.5,
+                      help="доля настоящих слов (нужен --dictionary)")
+    load.add_argument("--dictionary", default=None, help="словарь, по которому боты ищут слова")
+    load.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args(argv)
+
+    if args.command == "load":
+        asyncio.run(load_test(args.host, args.port, args.clients, args.seconds, args.interval,
+                              args.accuracy, args.dictionary, args.seed))
+        return
+
+    if args.perf:
+        metrics.enable(args.perf)
+    service = WordService(args.dictionary, args.cache, args.scores, args.shared)
+    room = RoundServer(service, args.rows, args.cols, args.round, args.pause, args.seed,
+                       args.min_words, args.reject_inflected)
+    try:
+        asyncio.run(room.serve(args.host, args.port))
+    except KeyboardInterrupt:
+        pass
+    finally:
+        metrics.flush()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,73 @@
+import math
+import time
+
+
+class RoundTimer:
+    """Таймер раунда на монотонных часах поверх root.after.
+
+    Время считается от момента старта по clock(), поэтому задержки цикла
+    событий и перевод системных часов не накапливаются. Следующий вызов
+    планируется ровно на ближайшую смену показываемой секунды (или на конец
+    раунда), и в любой момент запланирован не больше чем один after.
+
+    on_tick(seconds) получает прошедшие секунды, а в раунде с длительностью —
+    оставшиеся, и вызывается только когда это число меняется.
+    on_end() вызывается один раз, когда время раунда истекло.
+    """
+
+    def __init__(self, root, on_tick, on_end=None, clock=time.monotonic):
+        self.root = root
+        self.on_tick = on_tick
+        self.on_end = on_end
+        self.clock = clock
+        self.duration = None
+        self.start_time = None
+        self.after_id = None
+        self.shown = None
+
+    @property
+    def running(self):
+        return self.start_time is not None
+
+    def start(self, duration=None):
+        """Запускает раунд; duration в секундах, None — без ограничения"""
+        self.cancel()
+        self.duration = duration
+        self.start_time = self.clock()
+        self.shown = None
+        self._fire()
+
+    def cancel(self):
+        if self.after_id is not None:
+            self.root.after_cancel(self.after_id)
+            self.after_id = None
+        self.start_time = None
+
+    def elapsed(self):
+        return self.clock() - self.start_time if self.running else 0.0
+
+    def _fire(self):
+        self.after_id = None
+        elapsed = self.elapsed()
+        if self.duration is not None and elapsed >= self.duration:
+            self._show(0)
+            self.start_time = None
+            if self.on_end:
+                self.on_end()
+            return
+
+        if self.duration is None:
+            self._show(int(elapsed))
+            next_change = math.floor(elapsed) + 1
+        else:
+            remaining = self.duration - elapsed
+            self._show(math.ceil(remaining))
+            # The shown value drops when the remaining time crosses a whole second
+            next_change = self.duration - (math.ceil(remaining) - 1)
+        delay_ms = max(1, math.ceil((next_change - elapsed) * 1000))
+        self.after_id = self.root.after(delay_ms, self._fire)
+
+    def _show(self, seconds):
+        if seconds != self.shown:
+            self.shown = seconds
+            self.on_tick(seconds)
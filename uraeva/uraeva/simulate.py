@@ -0,0 +1,83 @@
+"""Безголовая симуляция игр на GameEngine для нагрузочного тестирования и баланса.
+
+Пример:
+    python simulate.py --games 10000 --rows 5 --cols 6 --accuracy 0.7
+"""
+import argparse
+import random
+import statistics
+import time
+
+from engine import GameEngine
+from grid import generate_grid
+from solver import build_trie
+from word_store import WordStore
+
+
+def cells_for_word(letters, word):
+    """Подбирает клетки сетки для слова, не используя клетку дважды"""
+    free = {}
+    for i, row in enumerate(letters):
+        for j, letter in enumerate(row):
+            free.setdefault(letter.lower(), []).append((i, j))
+    cells = []
+    for ch in word:
+        options = free.get(ch)
+        if not options:
+            return None
+        cells.append(options.pop())
+    return cells
+
+
+def simulate_game(engine, letters, solutions, rng, submissions=20, accuracy=0.7):
+    """Играет одну игру: с вероятностью accuracy игрок вводит настоящее слово, иначе случайные клетки"""
+    engine.start(letters)
+    all_cells = [(i, j) for i in range(len(letters)) for j in range(len(letters[0]))]
+    for _ in range(submissions):
+        cells = None
+        if solutions and rng.random() < accuracy:
+            cells = cells_for_word(letters, rng.choice(solutions))
+        if cells is None:
+            cells = rng.sample(all_cells, rng.randint(2, min(6, len(all_cells))))
+        for i, j in cells:
+            engine.select_cell(i, j)
+        engine.submit_word()
+    return engine.end()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Симуляция игр без интерфейса")
+    parser.add_argument("--dictionary", default="словарь.txt", help="файл словаря")
+    parser.add_argument("--games", type=int, default=10000, help="сколько игр сыграть")
+    parser.add_argument("--grids", type=int, default=50, help="сколько разных сеток сгенерировать")
+    parser.add_argument("--rows", type=int, default=5)
+    parser.add_argument("--cols", type=int, default=6)
+    parser.add_argument("--submissions", type=int, default=20, help="попыток за игру")
+    parser.add_argument("--accuracy", type=float, default=0.7, help="доля настоящих слов среди попыток")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args(argv)
+
+    store = WordStore(args.dictionary, compiled=True)
+    trie = build_trie(store)
+    grids = [generate_grid(args.rows, args.cols, args.seed + k, trie=trie, min_words=1, attempts=5)
+             for k in range(args.grids)]
+
+    rng = random.Random(args.seed)
+    # Simulated time: each tick of the clock is one second of play
+    clock = iter(range(10 ** 12)).__next__
+    engine = GameEngine(grids[0][0], validator=store.__contains__, clock=clock)
+
+    scores = []
+    start = time.perf_counter()
+    for game in range(args.games):
+        letters, solutions = grids[game % len(grids)]
+        scores.append(simulate_game(engine, letters, solutions, rng, args.submissions, args.accuracy))
+    elapsed = time.perf_counter() - start
+
+    print(f"Сыграно {args.games} игр за {elapsed:.2f} с ({args.games / elapsed:.0f} игр/с)")
+    print(f"Очки: среднее {statistics.mean(scores):.1f}, медиана {statistics.median(scores)}, "
+          f"максимум {max(scores)}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,152 @@
+"""Полные наборы решений для сеток: считаются в фоновом процессе и хранятся на диске.
+
+solve() смотрит только на то, сколько каких букв в сетке, поэтому ключ
+сетки — хэш её букв в отсортированном виде: переставленные сетки делят
+один набор решений. Рядом с решениями записывается версия словаря:
+сколько байт файла словаря было прочитано, последние из этих байт и размер
+общего словаря. Между сжатиями файл словаря только дописывается, так что
+для устаревшего набора достаточно дочитать строки после записанной длины
+и добавить слова, которые составляются из букв сетки. Заново набор
+считается, только если файл был переписан или сменился общий словарь.
+"""
+import hashlib
+import multiprocessing
+import os
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+
+from solver import build_trie, fits, solve
+from word_store import WordStore
+
+
+def grid_key(letters):
+    """Ключ сетки, не зависящий от расположения букв"""
+    flat = sorted(letter.lower() for row in letters for letter in row)
+    return hashlib.sha1("".join(flat).encode('utf-8')).hexdigest()
+
+
+class SolutionCache:
+    """Каталог с файлами решений: <ключ>.txt, первая строка — версия словаря"""
+
+    def __init__(self, directory="решения"):
+        self.directory = directory
+
+    def path(self, letters):
+        return os.path.join(self.directory, grid_key(letters) + ".txt")
+
+    def get(self, letters):
+        """(версия словаря, список слов) или None, если набора нет"""
+        try:
+            with open(self.path(letters), 'r', encoding='utf-8') as f:
+                header = f.readline().rstrip("\n")
+                if not header.startswith("#"):
+                    return None
+                return header[1:], [line.rstrip("\n") for line in f if line.strip()]
+        except FileNotFoundError:
+            return None
+
+    def put(self, letters, fingerprint, words):
+        os.makedirs(self.directory, exist_ok=True)
+        path = self.path(letters)
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            f.write(f"#{fingerprint}\n")
+            f.writelines(f"{word}\n" for word in words)
+        os.replace(tmp_path, path)
+
+
+_store = None
+_trie = None
+_cache = None
+_lemma_file = None
+
+
+def _init_worker(dictionary_path, cache_dir, lemma_file, shared):
+    global _store, _trie, _cache, _lemma_file
+    _store = WordStore(dictionary_path, compiled=True, shared=shared)
+    _trie = build_trie(_store, lemma_file)
+    _cache = SolutionCache(cache_dir)
+    _lemma_file = lemma_file
+
+
+def dictionary_version(store):
+    """Версия словаря: размер общего словаря/прочитанная длина файла/hex последних байт"""
+    shared = len(store.shared) if store.shared is not None else 0
+    return f"{shared}/{store.offset}/{store.tail.hex()}"
+
+
+def words_since(store, version):
+    """Слова, дописанные в файл словаря после версии version, или None, если их не узнать"""
+    try:
+        shared, offset, tail = version.split("/")
+        offset, tail = int(offset), bytes.fromhex(tail)
+    except ValueError:
+        return None
+    current = dictionary_version(store)
+    if shared != current.split("/")[0] or not len(tail) <= offset <= store.offset:
+        return None
+    with store.lock:
+        try:
+            with open(store.path, 'rb') as f:
+                f.seek(offset - len(tail))
+                # Only what the store has read, so the result matches the trie
+                data = f.read(store.offset - offset + len(tail))
+        except FileNotFoundError:
+            return None
+    if not data.startswith(tail):
+        # The file has been rewritten since
+        return None
+    lines = data[len(tail):].decode('utf-8', errors='replace').splitlines()
+    return [word for word in (line.strip().lower() for line in lines) if word]
+
+
+def solve_grid(letters):
+    """Выполняется в фоновом процессе: решения сетки из кэша, дополненные или заново"""
+    global _trie
+    # Pick up words other processes have written to the dictionary since
+    incoming = _store.sync()
+    if incoming is None:
+        _trie = build_trie(_store, _lemma_file)
+    else:
+        for word in incoming:
+            _trie.add(word)
+    # Nothing else in this process reads the replaced binary dictionary
+    for base in _store.take_retired():
+        base.close()
+
+    version = dictionary_version(_store)
+    cached = _cache.get(letters)
+    if cached is not None and cached[0] == version:
+        return cached[1]
+    added = words_since(_store, cached[0]) if cached is not None else None
+    if added is None:
+        words = sorted(set(solve(_trie, letters)))
+    else:
+        counts = Counter(letter.lower() for row in letters for letter in row)
+        words = sorted(set(cached[1]).union(
+            word for word in added if len(word) >= 2 and fits(word, counts)))
+    _cache.put(letters, version, words)
+    return words
+
+
+class SolutionWorker:
+    """Фоновый процесс со своим префиксным деревом словаря.
+
+    Дерево строится один раз при запуске процесса, так что окно игры
+    не ждёт ни его, ни поиска решений. Процесс запускается через spawn:
+    fork копировал бы процесс с работающими потоками и состоянием Tk.
+    """
+
+    def __init__(self, dictionary_path, cache_dir="решения", lemma_file="леммы.txt",
+                 shared=None):
+        self.executor = ProcessPoolExecutor(
+            max_workers=1, mp_context=multiprocessing.get_context("spawn"),
+            initializer=_init_worker,
+            initargs=(dictionary_path, cache_dir, lemma_file, shared))
+
+    def submit(self, letters):
+        """Возвращает Future со списком всех слов, которые можно составить из сетки"""
+        return self.executor.submit(solve_grid, [list(row) for row in letters])
+
+    def shutdown(self):
+        self.executor.shutdown(wait=False, cancel_futures=True)
@@ -0,0 +1,112 @@
+import os
+from collections import Counter
+
+# Key that marks the end of a word inside a trie node
+END = ""
+# Key of the bitmask of letters that continue the node (see letter_bit)
+NEXT = 0
+
+ALPHABET = "абвгдеёжзийклмнопрстуфхцчшщъыьэюя"
+_LETTER_BITS = {ch: 1 << k for k, ch in enumerate(ALPHABET)}
+# Hyphens and other rare characters share one extra bit
+_OTHER_BIT = 1 << len(ALPHABET)
+
+
+def letter_bit(ch):
+    """Бит буквы (в нижнем регистре) в масках продолжений"""
+    return _LETTER_BITS.get(ch, _OTHER_BIT)
+
+
+class Trie:
+    """Префиксное дерево слов на вложенных словарях.
+
+    Каждый узел хранит под ключом NEXT маску букв, которыми его можно
+    продолжить, так что проверка префикса стоит O(длина префикса), а
+    подходящие следующие буквы находятся одной операцией над масками.
+    """
+
+    def __init__(self, words=()):
+        self.root = {}
+        self.size = 0
+        for word in words:
+            self.add(word)
+
+    def add(self, word):
+        node = self.root
+        for ch in word:
+            node[NEXT] = node.get(NEXT, 0) | letter_bit(ch)
+            node = node.setdefault(ch, {})
+        if END not in node:
+            node[END] = word
+            self.size += 1
+
+    def find(self, prefix):
+        """Возвращает узел для префикса или None, если таких слов нет"""
+        node = self.root
+        for ch in prefix:
+            node = node.get(ch)
+            if node is None:
+                return None
+        return node
+
+    def next_letters(self, prefix):
+        """Маска букв, продолжающих префикс; None, если слов с таким началом нет"""
+        node = self.find(prefix)
+        return None if node is None else node.get(NEXT, 0)
+
+    def __contains__(self, word):
+        node = self.find(word)
+        return node is not None and END in node
+
+    def __len__(self):
+        return self.size
+
+
+def load_words(path):
+    """Читает список слов (по одному в строке), если файл существует"""
+    if not os.path.exists(path):
+        return []
+    with open(path, 'r', encoding='utf-8') as f:
+        return [word for word in (line.strip().lower() for line in f) if word]
+
+
+def build_trie(word_store, lemma_file="леммы.txt"):
+    trie = Trie(word_store)
+    for word in load_words(lemma_file):
+        trie.add(word)
+    return trie
+
+
+def fits(word, counts):
+    """Можно ли составить слово из букв сетки (counts — Counter её букв)"""
+    needed = Counter(word)
+    return all(counts[ch] >= n for ch, n in needed.items())
+
+
+def solve(trie, letters, min_length=2):
+    """Находит все слова из букв сетки, не используя одну клетку дважды"""
+    available = Counter(letter.lower() for row in letters for letter in row)
+    found = []
+
+    def walk(node, depth):
+        for ch, child in node.items():
+            if ch == END:
+                if depth >= min_length:
+                    found.append(child)
+            elif ch == NEXT:
+                continue
+            elif available[ch] > 0:
+                available[ch] -= 1
+                walk(child, depth + 1)
+                available[ch] += 1
+
+    walk(trie.root, 0)
+    return found
+
+
+def rank_hints(words, exclude=(), limit=10):
+    """Сортирует слова по очкам (длине), уже найденные отбрасывает"""
+    exclude = set(exclude)
+    candidates = [word for word in words if word not in exclude]
+    candidates.sort(key=lambda word: (-len(word), word))
+    return candidates[:limit]
@@ -2,11 +2,34 @@ import tkinter as tk
 from tkinter import messagebox
 from tkinter import ttk
 import time
-from pymorphy3 import MorphAnalyzer
-import os
+import queue
+import argparse
+from concurrent.futures import ThreadPoolExecutor
+from word_store import WordStore
+from solutions import SolutionWorker
+from solver import build_trie, solve, rank_hints
+from validation_cache import ValidationCache
+from word_stats import WordStats, PART_NAMES
+from grid import DEFAULT_LETTERS, LETTER_FREQUENCIES, generate_grid
+from engine import GameEngine
+from leaderboard import ScoreStore
+from dictionary_view import DictionaryView
+from perf import metrics
+from round_timer import RoundTimer
+from round_server import RoundClient
+import replay
+from theme import ThemeRegistry
+from morph_loader import FormPrefixes, MorphLoader, analyze
+from word_service import WordServiceClient
 
 class LetterGridApp:
-    def __init__(self, root):
+    SYNC_INTERVAL_MS = 2000
+
+    def __init__(self, root, launch_time=None, rows=5, cols=6, seed=None, min_words=20,
+                 round_length=60, service_url=None, reject_inflected=False,
+                 room_address="127.0.0.1:8766", replay_dir="повторы",
+                 dictionary_file="словарь.txt", shared_dictionary=None):
+        self.launch_time = launch_time if launch_time is not None else time.perf_counter()
         self.root = root
         self.root.title("Word Puzzle")
         
@@ -18,6 +41,7 @@ class LetterGridApp:
                 'button_bg': '#3e3e3e',
                 'active_bg': '#4a4a4a',
                 'highlight': '#4a9dff',
+                'extend': '#35604a',
                 'listbox_bg': '#3e3e3e',
                 'entry_bg': '#3e3e3e',
                 'text_wrap': 15
@@ -28,44 +52,217 @@ class LetterGridApp:
                 'button_bg': '#e0e0e0',
                 'active_bg': '#d0d0d0',
                 'highlight': '#0078d7',
+                'extend': '#a8dcb8',
                 'listbox_bg': '#ffffff',
                 'entry_bg': '#ffffff',
                 'text_wrap': 15
             }
         }
         self.current_theme = 'Dark'
-        self.open_windows = []
-
-        self.grid_size = 5
-        self.letters = [
-            ['А', 'Б', 'В', 'Г', 'Д', 'Е'],
-            ['Ж', 'З', 'И', 'Й', 'К', 'Л'],
-            ['М', 'Н', 'О', 'П', 'Р', 'С'],
-            ['Т', 'У', 'Ф', 'Х', 'Ц', 'Ч'],
-            ['Ш', 'Щ', 'Ы', 'Э', 'Ю', 'Я']
-        ]
-
-        self.selected_letters = []
-        self.start_time = None
-        self.timer_running = False
-        self.elapsed_time = 0
+        self.theme_registry = ThemeRegistry(self.themes)
+
+        self.grid_rows = rows
+        self.grid_cols = cols
+        self.grid_seed = seed
+        self.min_words = min_words
+        if (rows, cols) == (len(DEFAULT_LETTERS), len(DEFAULT_LETTERS[0])):
+            letters = [row[:] for row in DEFAULT_LETTERS]
+        else:
+            letters, _ = generate_grid(rows, cols, seed)
+
+        # All game state lives in the engine; this class only draws it. Room
+        # rounds follow the server's rule about other forms instead of this one
+        self.reject_inflected = reject_inflected
+        self.engine = GameEngine(letters, reject_inflected=reject_inflected)
+        self.round_timer = RoundTimer(self.root, self.update_timer, self.on_round_end,
+                                      clock=self.engine.clock)
+        self.round_lengths = {
+            '1 минута': 60,
+            '2 минуты': 120,
+            '3 минуты': 180,
+            'Без времени': None
+        }
+        round_name = next((name for name, seconds in self.round_lengths.items()
+                           if seconds == round_length), None)
+        if round_name is None:
+            round_name = f"{round_length} с"
+            self.round_lengths[round_name] = round_length
+        self.selected_round = tk.StringVar(value=round_name)
         self.user_name = None
-        self.score = 0
-        self.checked_words = []
         self.grid_buttons = []
+        self.highlighted_cells = {}
 
-        self.dictionary_file = "словарь.txt"
+        # A per-user file of new words, optionally on top of a shared read-only base
+        self.dictionary_file = dictionary_file
+        self.shared_dictionary = shared_dictionary
         self.create_dictionary_file()
-        self.morph = MorphAnalyzer()
+        # With a word service the analyzer lives there, shared by all clients
+        self.service = WordServiceClient(service_url) if service_url else None
+        self.morph_loader = None if self.service else MorphLoader().start()
+        # Prefixes of all word forms, for the cells that continue a selection
+        self.form_prefixes = None
+        # Competitive mode: rounds, timer and checks come from round_server
+        self.room_address = room_address
+        self.room = None
+        self.room_round = None
+        self.room_scores = {}
+        # Every session is recorded for debugging and audits (see replay.py)
+        self.replay = replay.ReplayWriter(replay.session_path(replay_dir)) if replay_dir else None
+        self.word_store = WordStore(self.dictionary_file, compiled=True, fsync=True,
+                                    shared=shared_dictionary)
+        self.validation_cache = ValidationCache("проверки.cache")
+        # Read-only copy of the sorted dictionary for the Tk thread, and views showing it
+        self.dictionary_words = self.word_store.snapshot()
+        self.dictionary_views = []
+        self.word_stats = WordStats("статистика.json")
+        self.score_store = ScoreStore("рекорды.db")
+
+        # A single worker: parsing holds the GIL anyway. The word store and the
+        # validation cache belong to it; the Tk thread only reads snapshots of the
+        # dictionary (see swap_dictionary) and touches them before the worker
+        # starts and after it is shut down
+        self.check_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="word-check")
+        self.check_results = queue.Queue()
+        self.pending_checks = 0
+        self.toast_after_id = None
+        self.sync_future = None
+
+        # The prefix tree is built on the worker, which owns the word store;
+        # words accepted meanwhile wait in trie_backlog
+        self.trie = None
+        self.trie_future = None
+        self.trie_backlog = []
+        self.grid_solutions = None
+        self.request_trie()
+        # Full solution set of the current grid, computed in a background process
+        self.solution_worker = SolutionWorker(self.dictionary_file, shared=shared_dictionary)
+        self.round_solutions = None
+        self.hints_enabled = tk.BooleanVar(value=False)
+        self.hints_enabled.trace_add('write', lambda *args: self.update_hints())
 
         self.create_ui()
         self.configure_styles()
         self.update_theme("Dark")
+        self.root.protocol("WM_DELETE_WINDOW", self.on_close)
+        self.root.after(0, self.report_startup)
+        self.root.after(self.SYNC_INTERVAL_MS, self.sync_dictionary)
+        if metrics.enabled:
+            self.start_lag_probe()
+
+    @property
+    def morph(self):
+        return self.morph_loader.get()
+
+    def report_startup(self):
+        window_time = time.perf_counter() - self.launch_time
+        print(f"Окно показано через {window_time:.3f} с")
+        if self.morph_loader is not None:
+            self.morph_loader.future.add_done_callback(self.report_morph_loaded)
+
+    def report_morph_loaded(self, future):
+        if future.exception() is None:
+            print(f"Анализатор загружен за {self.morph_loader.load_time:.3f} с")
+
+    def record(self, kind, *fields):
+        if self.replay:
+            self.replay.record(kind, *fields)
+
+    def record_start(self):
+        state = self.engine.state
+        self.record(replay.START, self.user_name or "Игрок", state.letters,
+                    state.duration or 0, int(self.engine.reject_inflected))
+
+    def on_close(self):
+        self.leave_room()
+        self.check_executor.shutdown(wait=True, cancel_futures=True)
+        self.solution_worker.shutdown()
+        if self.engine.state.running:
+            self.end_game()
+        self.score_store.close()
+        self.word_store.close()
+        self.validation_cache.save()
+        self.word_stats.save()
+        if self.service:
+            self.service.close()
+        if self.replay:
+            self.replay.close()
+        metrics.flush()
+        self.root.destroy()
 
     def create_dictionary_file(self):
-        if not os.path.exists(self.dictionary_file):
-            with open(self.dictionary_file, 'w', encoding='utf-8') as f:
-                f.write("")
+        # Mode 'x' fails if another instance has just created the file
+        try:
+            with open(self.dictionary_file, 'x', encoding='utf-8'):
+                pass
+        except FileExistsError:
+            pass
+
+    def sync_dictionary(self):
+        """Сохраняет новые слова и подхватывает слова других копий игры"""
+        future = self.sync_future
+        if future is not None and future.done():
+            self.sync_future = None
+            if future.exception() is None:
+                incoming, words, retired = future.result()
+                self.swap_dictionary(words, retired)
+                if incoming is None:
+                    # The file was rewritten by another instance
+                    self.request_trie()
+                elif incoming:
+                    self.add_to_trie(incoming)
+        if self.replay:
+            self.replay.flush()
+        if self.sync_future is None:
+            # The word store belongs to the worker thread
+            self.sync_future = self.check_executor.submit(self.sync_words)
+        self.root.after(self.SYNC_INTERVAL_MS, self.sync_dictionary)
+
+    def request_trie(self):
+        """Заново строит префиксное дерево словаря в рабочем потоке"""
+        self.trie = None
+        self.grid_solutions = None
+        self.trie_backlog = []
+        future = self.check_executor.submit(build_trie, self.word_store)
+        self.trie_future = future
+        self.root.after(100, lambda: self.wait_for_trie(future))
+
+    def wait_for_trie(self, future):
+        if future is not self.trie_future:
+            # A newer build has been requested since
+            return
+        if not future.done():
+            self.root.after(100, lambda: self.wait_for_trie(future))
+            return
+        self.trie_future = None
+        if future.cancelled() or future.exception() is not None:
+            return
+        self.trie = future.result()
+        for word in self.trie_backlog:
+            self.trie.add(word)
+        self.trie_backlog = []
+        self.update_hints()
+
+    def add_to_trie(self, words):
+        if self.trie is not None:
+            for word in words:
+                self.trie.add(word)
+            self.grid_solutions = None
+        elif self.trie_future is not None:
+            self.trie_backlog.extend(words)
+
+    def sync_words(self):
+        """Выполняется в рабочем потоке: синхронизация словаря и его свежий снимок"""
+        incoming = self.word_store.sync()
+        return incoming, self.word_store.snapshot(), self.word_store.take_retired()
+
+    def swap_dictionary(self, words, retired):
+        """Показывает новый снимок словаря и закрывает двоичные файлы, которые больше не читаются"""
+        if words is not self.dictionary_words:
+            self.dictionary_words = words
+            for view in self.dictionary_views:
+                view.set_words(words)
+        for base in retired:
+            base.close()
 
     def configure_styles(self):
         theme = self.themes[self.current_theme]
@@ -111,74 +308,23 @@ class LetterGridApp:
         # Update root and main containers
         self.root.config(bg=theme['bg'])
         
-        # Update all tracked widgets
-        self.update_widget_colors(theme)
-        
-        # Update grid buttons
-        for row in self.grid_buttons:
-            for btn in row:
-                btn.config(bg=theme['button_bg'],
-                        fg=theme['fg'],
-                        activebackground=theme['active_bg'])
+        # Update every registered widget, including those in open windows
+        self.theme_registry.apply(new_theme)
         
-        # Update listbox
-        self.words_listbox.config(bg=theme['listbox_bg'],
-                                fg=theme['fg'],
-                                selectbackground=theme['highlight'])
-        
-        # Update all open windows
-        for window in self.open_windows:
-            if window.winfo_exists():
-                self.update_window_theme(window, theme)
+        # Grid buttons are registered as plain buttons; restore the selection
+        for (i, j), color in self.highlighted_cells.items():
+            self.grid_buttons[i][j].config(bg=theme[color])
 
-    def update_widget_colors(self, theme):
-        # Update frame backgrounds
-        for frame in [self.top_frame, self.word_frame, self.grid_frame]:
-            frame.config(bg=theme['bg'])
-        
-        # Update labels
-        for label in [self.current_word_label, self.score_label, self.time_label]:
-            label.config(bg=theme['bg'], fg=theme['fg'])
-        
-        # Update buttons
-        for btn in [self.user_button, self.help_button, 
-                self.leaderboard_button, self.check_button,
-                self.start_button]:
-            btn.config(bg=theme['button_bg'],
-                    fg=theme['fg'],
-                    activebackground=theme['active_bg'])
-        
-        # Update mode menu
-        self.mode_menu.config(bg=theme['button_bg'],
-                            fg=theme['fg'],
-                            activebackground=theme['active_bg'])
-        self.mode_menu['menu'].config(bg=theme['button_bg'],
-                                    fg=theme['fg'],
-                                    activebackground=theme['active_bg'])
+    def themed(self, widget, role):
+        """Регистрирует виджет, чтобы он перекрашивался при смене темы"""
+        return self.theme_registry.register(widget, role)
 
-    def update_window_theme(self, window, theme):
-        window.config(bg=theme['bg'])
-        for child in window.winfo_children():
-            try:
-                if isinstance(child, tk.Frame):
-                    child.config(bg=theme['bg'])
-                elif isinstance(child, tk.Label):
-                    child.config(bg=theme['bg'], fg=theme['fg'])
-                elif isinstance(child, tk.Button):
-                    child.config(bg=theme['button_bg'],
-                                fg=theme['fg'],
-                                activebackground=theme['active_bg'])
-                elif isinstance(child, tk.Entry):
-                    child.config(bg=theme['entry_bg'],
-                            fg=theme['fg'],
-                            insertbackground=theme['fg'])
-                elif isinstance(child, tk.Listbox):
-                    child.config(bg=theme['listbox_bg'],
-                            fg=theme['fg'],
-                            selectbackground=theme['highlight'])
-                self.update_window_theme(child, theme)
-            except:
-                continue
+    def themed_view(self, view):
+        """Регистрирует DictionaryView и его виджеты"""
+        self.themed(view, 'frame')
+        self.themed(view.search_entry, 'entry')
+        self.themed(view.scrollbar, 'scrollbar')
+        self.themed(view.listbox, 'listbox')
 
     def create_ui(self):
         theme = self.themes[self.current_theme]
@@ -210,7 +356,7 @@ class LetterGridApp:
         self.user_button.grid(row=0, column=0, padx=5, sticky="ew")
 
         # Mode menu
-        self.modes = ['Обучение', 'Одиночный режим']
+        self.modes = ['Обучение', 'Одиночный режим', 'Соревнование']
         self.selected_mode = tk.StringVar(value=self.modes[0])
         self.mode_menu = tk.OptionMenu(
             self.top_frame, 
@@ -230,6 +376,25 @@ class LetterGridApp:
         )
         self.mode_menu.grid(row=0, column=1, padx=5, sticky="ew")
 
+        # Round length menu
+        self.round_menu = tk.OptionMenu(
+            self.top_frame,
+            self.selected_round,
+            *self.round_lengths
+        )
+        self.round_menu.config(
+            bg=theme['button_bg'],
+            fg=theme['fg'],
+            activebackground=theme['active_bg'],
+            borderwidth=0
+        )
+        self.round_menu['menu'].config(
+            bg=theme['button_bg'],
+            fg=theme['fg'],
+            activebackground=theme['active_bg']
+        )
+        self.round_menu.grid(row=0, column=5, padx=5, sticky="ew")
+
         # Help button
         self.help_button = tk.Button(
             self.top_frame, 
@@ -259,6 +424,7 @@ class LetterGridApp:
         self.top_frame.grid_columnconfigure(1, weight=1)
         self.top_frame.grid_columnconfigure(2, weight=1)
         self.top_frame.grid_columnconfigure(3, weight=1)
+        self.top_frame.grid_columnconfigure(5, weight=1)
 
         # Word frame
         self.word_frame = tk.Frame(self.root, bg=theme['bg'])
@@ -292,7 +458,7 @@ class LetterGridApp:
         # Score label
         self.score_label = tk.Label(
             self.root,
-            text=f"Очки: {self.score}",
+            text=f"Очки: {self.engine.state.score}",
             font=("Helvetica", 14),
             pady=10,
             bg=theme['bg'],
@@ -312,6 +478,17 @@ class LetterGridApp:
         )
         self.words_listbox.pack(pady=10)
 
+        # Hints label
+        self.hints_label = tk.Label(
+            self.root,
+            text="",
+            font=("Helvetica", 11),
+            wraplength=350,
+            bg=theme['bg'],
+            fg=theme['fg']
+        )
+        self.hints_label.pack()
+
         # Grid frame
         self.grid_frame = tk.Frame(self.root, bg=theme['bg'])
         self.grid_frame.pack(pady=20)
@@ -339,47 +516,187 @@ class LetterGridApp:
         )
         self.time_label.pack(pady=10)
 
+        # Toast label, shown over the bottom of the window
+        self.toast_label = tk.Label(
+            self.root,
+            text="",
+            font=("Helvetica", 12),
+            padx=10,
+            pady=5,
+            bg=theme['button_bg'],
+            fg=theme['fg']
+        )
+
+        for frame in [self.top_frame, self.word_frame, self.grid_frame]:
+            self.themed(frame, 'frame')
+        for label in [self.current_word_label, self.score_label, self.time_label,
+                      self.hints_label]:
+            self.themed(label, 'label')
+        for btn in [self.user_button, self.help_button,
+                    self.leaderboard_button, self.check_button,
+                    self.start_button]:
+            self.themed(btn, 'button')
+        for menu in [self.mode_menu, self.mode_menu['menu'],
+                     self.round_menu, self.round_menu['menu']]:
+            self.themed(menu, 'menu')
+        self.themed(self.words_listbox, 'listbox')
+
+    def show_toast(self, text, error=False):
+        """Показывает немодальное сообщение, которое само исчезает"""
+        theme = self.themes[self.current_theme]
+        if self.toast_after_id is not None:
+            self.root.after_cancel(self.toast_after_id)
+        self.toast_label.config(text=text,
+                                bg='#c0392b' if error else theme['highlight'],
+                                fg='white')
+        self.toast_label.place(relx=0.5, rely=1.0, anchor="s", y=-10)
+        self.toast_label.lift()
+        self.toast_after_id = self.root.after(2000, self.hide_toast)
+
+    def hide_toast(self):
+        self.toast_after_id = None
+        self.toast_label.place_forget()
+
     def add_to_dictionary(self, word):
         """Добавляет слово в файл словаря без дубликатов"""
-        with open(self.dictionary_file, 'r+', encoding='utf-8') as f:
-            existing_words = [line.strip().lower() for line in f.readlines()]
-            if word not in existing_words:
-                f.write(f"{word}\n")
+        with metrics.span("dictionary.add"):
+            return self.word_store.add(word)
 
     def check_word(self):
-        if not self.selected_letters:
-            messagebox.showwarning("Пусто", "Выберите буквы!")
+        if not self.engine.state.selection:
+            self.show_toast("Выберите буквы!", error=True)
             return
-            
-        word = "".join(self.selected_letters).lower()
-        is_valid = self.pymorphy_check(word)
-        
-        if is_valid:
-            self.add_to_dictionary(word)
-            points = len(word)
-            self.score += points
-            self.score_label.config(text=f"Очки: {self.score}")
-            self.checked_words.append(word)
+        if self.room is None and not self.engine.state.running:
+            self.engine.take_word()
+            self.highlight_word()
+            self.current_word_label.config(text="Текущее слово: ")
+            self.show_toast("Игра не начата — нажмите «Начать игру»", error=True)
+            return
+
+        with metrics.span("check_word"):
+            state = self.engine.state
+            word = self.engine.take_word()
+            self.record(replay.SUBMIT, word)
+            if self.engine.is_repeat(word):
+                self.highlight_word()
+                self.current_word_label.config(text="Текущее слово: ")
+                self.show_toast(f"«{word}» уже было", error=True)
+                return
+            if self.room is not None:
+                # The round server checks the word and answers with a verdict
+                self.room.submit(word, self.room_round)
+                self.highlight_word()
+                self.current_word_label.config(text="Текущее слово: ")
+                return
+            future = self.check_executor.submit(self.validate_word, word)
+            future.add_done_callback(lambda future: self.check_results.put((word, state, future)))
+            self.pending_checks += 1
+            if self.pending_checks == 1:
+                self.root.after(50, self.poll_check_results)
+
+            self.highlight_word()
+            self.current_word_label.config(text="Текущее слово: ")
+
+    def validate_word(self, word):
+        """Выполняется в рабочем потоке: проверка слова и запись его леммы в словарь"""
+        with metrics.span("validate_word"):
+            lemma = self.lemma_of(word)
+            added = bool(lemma) and self.add_to_dictionary(lemma)
+            part = self.part_of_speech(lemma) if lemma else None
+        metrics.count("words.valid" if lemma else "words.invalid")
+        return lemma, added, part
+
+    def poll_check_results(self):
+        # Tk widgets may only be touched from the main thread, so results
+        # are handed over through a queue and picked up here
+        while True:
+            try:
+                word, state, future = self.check_results.get_nowait()
+            except queue.Empty:
+                break
+            self.pending_checks -= 1
+            self.finish_check(word, state, future)
+        if self.pending_checks:
+            self.root.after(50, self.poll_check_results)
+
+    def finish_check(self, word, state, future):
+        if future.cancelled():
+            return
+        if future.exception() is not None:
+            self.show_toast(f"Не удалось проверить «{word}»", error=True)
+            return
+
+        lemma, added, part = future.result()
+        if added:
+            self.add_to_trie([lemma])
+
+        if state is not self.engine.state or not state.running:
+            # The game this word was submitted in is already over
+            self.show_toast(f"«{word}» не засчитано: раунд уже закончился", error=True)
+            return
+        if lemma and self.engine.is_repeat(word, lemma):
+            self.record(replay.VERDICT, word, lemma, 0)
+            self.show_toast(f"«{word}»: слово «{lemma}» уже было", error=True)
+        elif lemma:
+            points = self.engine.apply_verdict(word, True, lemma)
+            self.record(replay.VERDICT, word, lemma, points)
+            self.word_stats.add(word, lemma, part, self.user_name or "Игрок")
+            self.score_label.config(text=f"Очки: {state.score}")
             self.words_listbox.insert(tk.END, word)
-            messagebox.showinfo("Успех!", f"Слово принято! +{points} очков")
+            self.update_hints()
+            self.show_toast(f"«{word}» принято! +{points} очков")
         else:
-            messagebox.showwarning("Ошибка", "Такого слова не существует!")
-        
-        self.selected_letters = []
-        self.highlight_word()
-        self.current_word_label.config(text="Текущее слово: ")
-
-    def pymorphy_check(self, word):
-        parsed = self.morph.parse(word)
-        return parsed[0].score >= 0.5 and parsed[0].tag.POS is not None
+            self.record(replay.VERDICT, word, "", 0)
+            self.word_stats.reject(word)
+            self.show_toast(f"«{word}»: такого слова не существует!", error=True)
+
+    def lemma_of(self, word):
+        """Лемма слова или "" для неверного слова; формы берутся из кэша проверок"""
+        return self.validation_cache.lookup(word, self.find_lemma)
+
+    def find_lemma(self, word):
+        return self.service.lemma(word) if self.service else self.parse_lemma(word)
+
+    def part_of_speech(self, lemma):
+        """Тег части речи леммы ("" — неизвестна, None — анализатора нет)"""
+        part = self.word_stats.parts_of.get(lemma)
+        if part is None and self.morph_loader is not None:
+            part = self.morph.parse(lemma)[0].tag.POS or ""
+        return part
+
+    def parse_lemma(self, word):
+        morph = self.morph
+        with metrics.span("morph.parse"):
+            return analyze(morph, word)
+
+    def update_hints(self):
+        if not self.hints_enabled.get():
+            self.hints_label.config(text="")
+            return
+        if self.trie is None:
+            self.hints_label.config(text="Подсказки появятся, когда загрузится словарь")
+            return
+        if self.grid_solutions is None:
+            self.grid_solutions = solve(self.trie, self.engine.state.letters)
+        state = self.engine.state
+        hints = rank_hints(self.grid_solutions, exclude=state.lemmas | state.forms, limit=5)
+        if hints:
+            self.hints_label.config(text="Подсказки: " + ", ".join(hints))
+        else:
+            self.hints_label.config(text="Подсказок нет")
 
     def create_grid(self, frame):
         theme = self.themes[self.current_theme]
+        for row in self.grid_buttons:
+            for button in row:
+                button.destroy()
         self.grid_buttons = []
-        for i in range(self.grid_size):
+        self.highlighted_cells = {}
+        state = self.engine.state
+        for i in range(state.rows):
             row_buttons = []
-            for j in range(6):
-                letter = self.letters[i][j]
+            for j in range(state.cols):
+                letter = state.letters[i][j]
                 button = tk.Button(
                     frame, 
                     text=letter, 
@@ -392,47 +709,297 @@ class LetterGridApp:
                     borderwidth=0
                 )
                 button.grid(row=i, column=j, padx=5, pady=5)
+                self.themed(button, 'button')
                 row_buttons.append(button)
             self.grid_buttons.append(row_buttons)
 
+    def new_grid(self):
+        """Генерирует новую сетку, в которой можно составить хотя бы min_words слов.
+
+        Пока префиксное дерево строится, сетка получается без этой проверки.
+        """
+        if self.grid_seed is not None:
+            self.grid_seed += 1
+        # Letters of the words players actually find get a larger share
+        weights = self.word_stats.letter_weights(LETTER_FREQUENCIES)
+        letters, self.grid_solutions = generate_grid(
+            self.grid_rows, self.grid_cols, self.grid_seed,
+            trie=self.trie, min_words=self.min_words, weights=weights
+        )
+        if self.trie is None:
+            self.grid_solutions = None
+        return letters
+
     def on_click(self, i, j):
-        letter = self.letters[i][j]
-        if letter not in self.selected_letters:
-            self.selected_letters.append(letter)
-            self.highlight_word()
-            current_word = ' '.join(self.selected_letters)
+        if self.engine.select_cell(i, j):
+            self.record(replay.SELECT, i, j)
+            # None means no word form starts with the selection; until the
+            # analyzer is loaded (or with a word service) nothing is known either way
+            next_letters = 0
+            if self.load_form_prefixes():
+                next_letters = self.form_prefixes.next_letters(self.engine.current_word().lower())
+            self.highlight_word(next_letters or 0)
+            current_word = ' '.join(self.engine.selected_letters())
             wrapped_word = '\n'.join([
                 current_word[i:i + self.themes[self.current_theme]['text_wrap']]
                 for i in range(0, len(current_word), self.themes[self.current_theme]['text_wrap'])
             ])
+            if next_letters is None:
+                wrapped_word += "\n(слов с таким началом нет)"
             self.current_word_label.config(text=f"Текущее слово: {wrapped_word}")
             self.check_button.config(state=tk.NORMAL)
 
-    def highlight_word(self):
+    def load_form_prefixes(self):
+        """Готовит начала словоформ, как только загрузился анализатор"""
+        if self.form_prefixes is None and self.morph_loader is not None \
+                and self.morph_loader.ready() and self.morph_loader.future.exception() is None:
+            self.form_prefixes = FormPrefixes(self.morph)
+        return self.form_prefixes is not None
+
+    def highlight_word(self, next_letters=0):
+        """Перекрашивает только те кнопки, чей цвет изменился.
+
+        next_letters — маска букв (см. solver.letter_bit), которыми можно
+        продолжить набранное начало слова; такие невыбранные клетки
+        подсвечиваются цветом 'extend'.
+        """
         theme = self.themes[self.current_theme]
-        for i in range(self.grid_size):
-            for j in range(6):
-                self.grid_buttons[i][j].config(bg=theme['button_bg'])
-        
-        for letter in self.selected_letters:
-            for i in range(self.grid_size):
-                for j in range(6):
-                    if self.letters[i][j] == letter:
-                        self.grid_buttons[i][j].config(bg=theme['highlight'])
-                        break
+        target = dict.fromkeys(self.engine.state.selection, 'highlight')
+        if next_letters and target:
+            target.update(dict.fromkeys(self.engine.extending_cells(next_letters), 'extend'))
+
+        for i, j in self.highlighted_cells.keys() - target.keys():
+            self.grid_buttons[i][j].config(bg=theme['button_bg'])
+        for (i, j), color in target.items():
+            if self.highlighted_cells.get((i, j)) != color:
+                self.grid_buttons[i][j].config(bg=theme[color])
+        self.highlighted_cells = target
 
     def start_game(self):
-        if not self.timer_running:
-            self.start_time = time.time()
-            self.timer_running = True
-            self.elapsed_time = 0
-            self.update_timer()
-
-    def update_timer(self):
-        if self.timer_running:
-            self.elapsed_time = time.time() - self.start_time
-            self.time_label.config(text=f"Время: {int(self.elapsed_time)} секунд")
-            self.root.after(1000, self.update_timer)
+        if self.selected_mode.get() == 'Соревнование':
+            self.join_room()
+            return
+        self.leave_room()
+        if self.engine.state.running:
+            self.end_game()
+        self.engine.reject_inflected = self.reject_inflected
+        self.engine.start(self.new_grid(), self.round_lengths[self.selected_round.get()])
+        self.record_start()
+        self.round_solutions = self.solution_worker.submit(self.engine.state.letters)
+        self.create_grid(self.grid_frame)
+        self.current_word_label.config(text="Текущее слово: ")
+        self.score_label.config(text=f"Очки: {self.engine.state.score}")
+        self.words_listbox.delete(0, tk.END)
+        self.update_hints()
+        self.round_timer.start(self.engine.state.duration)
+
+    def end_game(self):
+        """Останавливает таймер и сохраняет результат в таблицу рекордов"""
+        self.round_timer.cancel()
+        score = self.engine.end()
+        self.record(replay.END, score)
+        if score:
+            self.score_store.record(self.user_name or "Игрок", score)
+            self.score_store.flush()
+        self.word_stats.save()
+        return score
+
+    def on_round_end(self):
+        score = self.end_game()
+        self.show_toast(f"Время вышло! Очки: {score}")
+        if self.round_solutions is not None:
+            self.wait_for_summary(self.engine.state, self.round_solutions)
+
+    def wait_for_summary(self, state, future):
+        """Показывает итоги раунда, как только фоновый процесс досчитает решения"""
+        if state is not self.engine.state:
+            return
+        if not future.done():
+            self.root.after(100, lambda: self.wait_for_summary(state, future))
+            return
+        if future.cancelled() or future.exception() is not None:
+            return
+        self.show_round_summary(state, future.result())
+
+    def show_round_summary(self, state, solutions):
+        theme = self.themes[self.current_theme]
+        # Sorted alphabetically for the prefix search of DictionaryView
+        missed = sorted(set(solutions) - state.forms - state.lemmas)
+        # The player may also score forms that are not in the dictionary
+        max_score = sum(len(word) for word in set(solutions) | state.forms)
+
+        summary_window = tk.Toplevel(self.root)
+        summary_window.title("Итоги раунда")
+        summary_window.geometry("400x400")
+        summary_window.configure(bg=theme['bg'])
+        self.themed(summary_window, 'window')
+
+        score_label = tk.Label(summary_window,
+                               text=f"Очки: {state.score} из {max_score} возможных",
+                               font=("Helvetica", 14),
+                               bg=theme['bg'],
+                               fg=theme['fg'])
+        score_label.pack(pady=10)
+        self.themed(score_label, 'label')
+
+        missed_label = tk.Label(summary_window,
+                                text=f"Пропущено слов: {len(missed)}" if missed
+                                else "Вы нашли все слова!",
+                                bg=theme['bg'],
+                                fg=theme['fg'])
+        missed_label.pack()
+        self.themed(missed_label, 'label')
+
+        if missed:
+            view = DictionaryView(summary_window, missed, theme)
+            view.pack(fill=tk.BOTH, expand=True)
+            self.themed_view(view)
+
+    def join_room(self):
+        if self.room is not None:
+            return
+        host, _, port = self.room_address.rpartition(":")
+        try:
+            self.room = RoundClient(host, int(port))
+        except OSError:
+            self.show_toast("Сервер раундов недоступен", error=True)
+            return
+        if self.engine.state.running:
+            self.end_game()
+        self.room_round = None
+        self.room_scores = {}
+        self.room.join(self.user_name or "Игрок")
+        self.show_toast("Ожидание начала раунда...")
+        self.root.after(50, self.poll_room)
+
+    def leave_room(self):
+        if self.room is None:
+            return
+        self.room.close()
+        self.room = None
+        if self.engine.state.running:
+            # The server keeps the room's scores, so only the replay gets them
+            self.record(replay.END, self.engine.end())
+
+    def poll_room(self):
+        # Messages are read by the client's thread and handled on the Tk thread
+        while self.room is not None:
+            try:
+                message = self.room.messages.get_nowait()
+            except queue.Empty:
+                break
+            self.handle_room_message(message)
+        if self.room is not None:
+            self.root.after(50, self.poll_room)
+
+    def handle_room_message(self, message):
+        kind = message['type']
+        if kind == 'round':
+            self.room_round = message['round']
+            self.room_scores = {}
+            self.engine.reject_inflected = message.get('reject_inflected', False)
+            self.engine.start(message['letters'], message['duration'])
+            self.record_start()
+            self.grid_solutions = None
+            self.create_grid(self.grid_frame)
+            self.current_word_label.config(text="Текущее слово: ")
+            self.words_listbox.delete(0, tk.END)
+            self.show_room_score(0)
+            self.update_hints()
+            self.update_timer(message['remaining'])
+        elif kind == 'tick' and message['round'] == self.room_round:
+            self.update_timer(message['remaining'])
+        elif kind == 'verdict':
+            word = message['word']
+            self.record(replay.VERDICT, word, message.get('lemma', ""), message['points'])
+            if message['points']:
+                self.engine.apply_verdict(word, True, message['lemma'])
+                self.word_stats.add(word, message['lemma'], player=self.user_name or "Игрок")
+                self.show_room_score(message['score'])
+                self.words_listbox.insert(tk.END, word)
+                self.update_hints()
+                self.show_toast(f"«{word}» принято! +{message['points']} очков")
+            else:
+                self.show_toast(f"«{word}»: {message['reason']}", error=True)
+        elif kind == 'scores' and message['round'] == self.room_round:
+            self.room_scores.update(message['scores'])
+            self.show_room_score(self.engine.state.score)
+        elif kind == 'round_end':
+            self.record(replay.END, self.engine.end())
+            self.update_timer(0)
+            if message['top'] and message['top'][0][1]:
+                name, score = message['top'][0]
+                self.show_toast(f"Раунд окончен! Победитель: {name} ({score} очков)")
+            else:
+                self.show_toast("Раунд окончен!")
+        elif kind == 'disconnected':
+            self.room = None
+            self.record(replay.END, self.engine.end())
+            self.show_toast("Соединение с сервером раундов потеряно", error=True)
+
+    def show_room_score(self, score):
+        me = self.user_name or "Игрок"
+        rank = 1 + sum(1 for name, other in self.room_scores.items() if name != me and other > score)
+        players = len(self.room_scores.keys() | {me})
+        self.score_label.config(text=f"Очки: {score} (место {rank} из {players})")
+
+    def update_timer(self, seconds):
+        with metrics.span("update_timer"):
+            self.engine.tick()
+            if self.engine.state.duration is None:
+                self.time_label.config(text=f"Время: {seconds} секунд")
+            else:
+                self.time_label.config(text=f"Осталось: {seconds} секунд")
+
+    def start_lag_probe(self, interval=100):
+        """Раз в interval мс замеряет, насколько позже срока срабатывает root.after"""
+        expected = time.perf_counter() + interval / 1000
+
+        def probe():
+            metrics.observe("event_loop_lag", max(0.0, time.perf_counter() - expected))
+            if metrics.enabled:
+                self.start_lag_probe(interval)
+
+        self.root.after(interval, probe)
+
+    def show_perf_overlay(self):
+        theme = self.themes[self.current_theme]
+        if not metrics.enabled:
+            metrics.enable()
+            self.start_lag_probe()
+
+        perf_window = tk.Toplevel(self.root)
+        perf_window.title("Производительность")
+        perf_window.geometry("420x300")
+        perf_window.configure(bg=theme['bg'])
+        self.themed(perf_window, 'window')
+
+        perf_label = tk.Label(perf_window,
+                              text="",
+                              font=("Courier", 10),
+                              justify="left",
+                              anchor="nw",
+                              bg=theme['bg'],
+                              fg=theme['fg'])
+        perf_label.pack(fill=tk.BOTH, expand=True, padx=10, pady=10)
+        self.themed(perf_label, 'label')
+
+        def refresh():
+            if not perf_window.winfo_exists():
+                return
+            snapshot = metrics.snapshot()
+            lines = [f"{'замер':<16}{'n':>6}{'p50, мс':>10}{'p99, мс':>10}"]
+            for name, summary in sorted(snapshot['histograms'].items()):
+                lines.append(f"{name:<16}{summary['count']:>6}"
+                             f"{summary['p50_ms']:>10.2f}{summary['p99_ms']:>10.2f}")
+            for name, value in sorted(snapshot['counters'].items()):
+                lines.append(f"{name:<16}{value:>6}")
+            cache = self.validation_cache.stats()
+            lines.append(f"кэш проверок: {cache['size']} слов, попаданий {cache['hit_rate']:.0%}")
+            perf_label.config(text="\n".join(lines))
+            perf_window.after(1000, refresh)
+
+        refresh()
 
     def show_user_window(self):
         # Fix for duplicate windows
@@ -446,7 +1013,7 @@ class LetterGridApp:
         user_window.title("Вход / Регистрация")
         user_window.geometry("350x400")
         user_window.configure(bg=theme['bg'])
-        self.open_windows.append(user_window)
+        self.themed(user_window, 'window')
         
         user_window.protocol("WM_DELETE_WINDOW", lambda: self.on_user_window_close(user_window))
 
@@ -457,6 +1024,7 @@ class LetterGridApp:
                                bg=theme['bg'],
                                fg=theme['fg'])
         welcome_label.pack(pady=10)
+        self.themed(welcome_label, 'label')
 
         # Email entry
         email_label = tk.Label(user_window, 
@@ -464,12 +1032,14 @@ class LetterGridApp:
                              bg=theme['bg'],
                              fg=theme['fg'])
         email_label.pack(pady=5)
+        self.themed(email_label, 'label')
         self.email_entry = tk.Entry(user_window, 
                                   width=30,
                                   bg=theme['entry_bg'],
                                   fg=theme['fg'],
                                   insertbackground=theme['fg'])
         self.email_entry.pack(pady=5)
+        self.themed(self.email_entry, 'entry')
 
         # Password entry
         password_label = tk.Label(user_window, 
@@ -477,6 +1047,7 @@ class LetterGridApp:
                                 bg=theme['bg'],
                                 fg=theme['fg'])
         password_label.pack(pady=5)
+        self.themed(password_label, 'label')
         self.password_entry = tk.Entry(user_window, 
                                      width=30, 
                                      show="*",
@@ -484,10 +1055,12 @@ class LetterGridApp:
                                      fg=theme['fg'],
                                      insertbackground=theme['fg'])
         self.password_entry.pack(pady=5)
+        self.themed(self.password_entry, 'entry')
 
         # Buttons frame
         button_frame = tk.Frame(user_window, bg=theme['bg'])
         button_frame.pack(pady=10)
+        self.themed(button_frame, 'frame')
 
         login_button = tk.Button(button_frame, 
                                text="Войти", 
@@ -497,6 +1070,7 @@ class LetterGridApp:
                                activebackground=theme['active_bg'],
                                borderwidth=0)
         login_button.grid(row=0, column=0, padx=5)
+        self.themed(login_button, 'button')
 
         register_button = tk.Button(button_frame, 
                                   text="Зарегистрироваться", 
@@ -506,10 +1080,12 @@ class LetterGridApp:
                                   activebackground=theme['active_bg'],
                                   borderwidth=0)
         register_button.grid(row=0, column=1, padx=5)
+        self.themed(register_button, 'button')
 
         # Social buttons
         social_frame = tk.Frame(user_window, bg=theme['bg'])
         social_frame.pack(pady=10)
+        self.themed(social_frame, 'frame')
 
 
     
@@ -521,6 +1097,7 @@ class LetterGridApp:
                                   activebackground=theme['active_bg'],
                                   borderwidth=0)
         telegram_button.grid(row=0, column=0, padx=5)
+        self.themed(telegram_button, 'button')
 
         vk_button = tk.Button(social_frame, 
                             text="ВКонтакте", 
@@ -530,6 +1107,7 @@ class LetterGridApp:
                             activebackground=theme['active_bg'],
                             borderwidth=0)
         vk_button.grid(row=0, column=1, padx=5)
+        self.themed(vk_button, 'button')
 
         email_button = tk.Button(social_frame, 
                                text="E-mail", 
@@ -539,6 +1117,7 @@ class LetterGridApp:
                                activebackground=theme['active_bg'],
                                borderwidth=0)
         email_button.grid(row=0, column=2, padx=5)
+        self.themed(email_button, 'button')
 
         # Forgot password
         forgot_password_button = tk.Button(user_window, 
@@ -549,16 +1128,17 @@ class LetterGridApp:
                                         activebackground=theme['active_bg'],
                                         borderwidth=0)
         forgot_password_button.pack(pady=10)
+        self.themed(forgot_password_button, 'flat_button')
 
     def on_user_window_close(self, window):
         self._user_window_open = False
-        self.open_windows.remove(window)
         window.destroy()
 
     def login(self):
         email = self.email_entry.get()
         password = self.password_entry.get()
         if email and password:
+            self.user_name = email
             messagebox.showinfo("Вход", f"Добро пожаловать, {email}!")
         else:
             messagebox.showwarning("Ошибка", "Введите все данные!")
@@ -590,7 +1170,7 @@ class LetterGridApp:
         help_window.title("Помощь")
         help_window.geometry("400x400")
         help_window.configure(bg=theme['bg'])
-        self.open_windows.append(help_window)
+        self.themed(help_window, 'window')
 
         help_title = tk.Label(help_window, 
                             text="Помощь", 
@@ -598,8 +1178,8 @@ class LetterGridApp:
                             bg=theme['bg'],
                             fg=theme['fg'])
         help_title.pack(pady=10)
+        self.themed(help_title, 'label')
 
-        self.hints_enabled = tk.BooleanVar(value=False)
         hints_switch = tk.Checkbutton(help_window, 
                                    text="Включить подсказки",
                                    variable=self.hints_enabled,
@@ -609,6 +1189,7 @@ class LetterGridApp:
                                    activeforeground=theme['fg'],
                                    selectcolor=theme['button_bg'])
         hints_switch.pack(pady=10)
+        self.themed(hints_switch, 'checkbutton')
 
         dictionary_button = tk.Button(help_window, 
                                     text="Таблица (словарь)", 
@@ -618,6 +1199,7 @@ class LetterGridApp:
                                     activebackground=theme['active_bg'],
                                     borderwidth=0)
         dictionary_button.pack(pady=10)
+        self.themed(dictionary_button, 'button')
 
         rules_button = tk.Button(help_window, 
                               text="Гайд (Правила игры)", 
@@ -627,6 +1209,27 @@ class LetterGridApp:
                               activebackground=theme['active_bg'],
                               borderwidth=0)
         rules_button.pack(pady=10)
+        self.themed(rules_button, 'button')
+
+        perf_button = tk.Button(help_window,
+                                text="Производительность",
+                                command=self.show_perf_overlay,
+                                bg=theme['button_bg'],
+                                fg=theme['fg'],
+                                activebackground=theme['active_bg'],
+                                borderwidth=0)
+        perf_button.pack(pady=10)
+        self.themed(perf_button, 'button')
+
+        stats_button = tk.Button(help_window,
+                                 text="Статистика слов",
+                                 command=self.show_stats,
+                                 bg=theme['button_bg'],
+                                 fg=theme['fg'],
+                                 activebackground=theme['active_bg'],
+                                 borderwidth=0)
+        stats_button.pack(pady=10)
+        self.themed(stats_button, 'button')
 
     def show_dictionary(self):
         theme = self.themes[self.current_theme]
@@ -635,31 +1238,54 @@ class LetterGridApp:
         dictionary_window.title("Таблица (словарь)")
         dictionary_window.geometry("400x300")
         dictionary_window.configure(bg=theme['bg'])
-        self.open_windows.append(dictionary_window)
-
-        scrollbar = tk.Scrollbar(dictionary_window, bg=theme['button_bg'])
-        scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
+        self.themed(dictionary_window, 'window')
 
-        listbox = tk.Listbox(
-            dictionary_window, 
-            yscrollcommand=scrollbar.set,
-            font=("Helvetica", 12),
-            width=40,
-            bg=theme['listbox_bg'],
-            fg=theme['fg'],
-            selectbackground=theme['highlight']
-        )
-        listbox.pack(fill=tk.BOTH, expand=True)
+        view = DictionaryView(dictionary_window, self.dictionary_words, theme)
+        view.pack(fill=tk.BOTH, expand=True)
+        self.themed_view(view)
+        self.dictionary_views.append(view)
+        view.bind("<Destroy>", lambda event: self.forget_view(event, view), add="+")
+        view.search_entry.focus_set()
 
-        try:
-            with open(self.dictionary_file, 'r', encoding='utf-8') as f:
-                words = sorted([line.strip() for line in f.readlines() if line.strip()])
-                for word in words:
-                    listbox.insert(tk.END, word.capitalize())
-        except FileNotFoundError:
-            listbox.insert(tk.END, "Словарь пуст")
+    def forget_view(self, event, view):
+        # Child widgets report <Destroy> too
+        if event.widget is view and view in self.dictionary_views:
+            self.dictionary_views.remove(view)
 
-        scrollbar.config(command=listbox.yview)
+    def show_stats(self):
+        theme = self.themes[self.current_theme]
+        stats = self.word_stats
+
+        stats_window = tk.Toplevel(self.root)
+        stats_window.title("Статистика слов")
+        stats_window.geometry("400x450")
+        stats_window.configure(bg=theme['bg'])
+        self.themed(stats_window, 'window')
+
+        lines = [f"Проверено слов: {stats.checked}, принято: {stats.accepted} "
+                 f"({stats.acceptance_rate():.0%})", "", "По длине (принято / доля):"]
+        for length in sorted(stats.lengths):
+            lines.append(f"  {length} букв: {stats.lengths[length]} / "
+                         f"{stats.acceptance_rate(length):.0%}")
+        lines += ["", "Первые буквы: " + ", ".join(
+            f"{letter.upper()} {count}" for letter, count in stats.first_letters.most_common(8))]
+        lines += ["", "Части речи:"]
+        lines += [f"  {PART_NAMES.get(part, part)}: {count}"
+                  for part, count in stats.parts.most_common(6)]
+        lines += ["", "Частые слова: " + ", ".join(
+            f"{word} ({count})" for word, count in stats.words.most_common(8))]
+        lines += ["Игроки: " + ", ".join(
+            f"{player} ({count})" for player, count in stats.players.most_common(5))]
+
+        stats_label = tk.Label(stats_window,
+                               text="\n".join(lines),
+                               font=("Helvetica", 11),
+                               justify="left",
+                               wraplength=380,
+                               bg=theme['bg'],
+                               fg=theme['fg'])
+        stats_label.pack(pady=10, padx=10, anchor="w")
+        self.themed(stats_label, 'label')
 
     def show_rules(self):
         theme = self.themes[self.current_theme]
@@ -668,7 +1294,7 @@ class LetterGridApp:
         rules_window.title("Правила игры")
         rules_window.geometry("400x300")
         rules_window.configure(bg=theme['bg'])
-        self.open_windows.append(rules_window)
+        self.themed(rules_window, 'window')
 
         rules_text = """1. Выберите буквы из сетки.
 2. Составьте слова, используя выбранные буквы.
@@ -682,6 +1308,7 @@ class LetterGridApp:
                              bg=theme['bg'],
                              fg=theme['fg'])
         rules_label.pack(pady=10)
+        self.themed(rules_label, 'label')
 
     def show_leaderboard(self):
         theme = self.themes[self.current_theme]
@@ -690,7 +1317,7 @@ class LetterGridApp:
         leaderboard_window.title("Таблица лидеров")
         leaderboard_window.geometry("400x300")
         leaderboard_window.configure(bg=theme['bg'])
-        self.open_windows.append(leaderboard_window)
+        self.themed(leaderboard_window, 'window')
 
         leaderboard_title = tk.Label(leaderboard_window, 
                                    text="Таблица лидеров", 
@@ -698,19 +1325,83 @@ class LetterGridApp:
                                    bg=theme['bg'],
                                    fg=theme['fg'])
         leaderboard_title.pack(pady=10)
+        self.themed(leaderboard_title, 'label')
+
+        self.score_store.flush()
+        rank = self.score_store.rank(self.user_name or "Игрок")
+        rank_label = tk.Label(leaderboard_window,
+                              text=f"Ваше место: {rank}" if rank else "Вы ещё не играли",
+                              bg=theme['bg'],
+                              fg=theme['fg'])
+        rank_label.pack()
+        self.themed(rank_label, 'label')
+
+        scrollbar = tk.Scrollbar(leaderboard_window, bg=theme['button_bg'])
+        scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
+        self.themed(scrollbar, 'scrollbar')
 
-        columns = ("Никнейм", "Очки")
+        columns = ("Место", "Никнейм", "Очки")
         tree = ttk.Treeview(leaderboard_window, columns=columns, show="headings")
         tree.pack(fill=tk.BOTH, expand=True)
 
+        tree.heading("Место", text="Место")
         tree.heading("Никнейм", text="Никнейм")
         tree.heading("Очки", text="Очки")
-
-        tree.insert("", "end", values=("Игрок1", 100))
-        tree.insert("", "end", values=("Игрок2", 90))
-        tree.insert("", "end", values=("Игрок3", 80))
+        tree.column("Место", width=60, anchor="center")
+
+        # Rows are fetched a page at a time as the list is scrolled to the end
+        page = {'last': None, 'loaded': 0, 'done': False}
+
+        def load_page():
+            if page['done']:
+                return
+            rows = self.score_store.top(50, after=page['last'])
+            for user, score, _, _ in rows:
+                page['loaded'] += 1
+                tree.insert("", "end", values=(page['loaded'], user, score))
+            if len(rows) < 50:
+                page['done'] = True
+            if rows:
+                page['last'] = rows[-1]
+
+        def on_scroll(first, last):
+            scrollbar.set(first, last)
+            if float(last) > 0.9:
+                load_page()
+
+        tree.config(yscrollcommand=on_scroll)
+        scrollbar.config(command=tree.yview)
+        load_page()
 
 if __name__ == "__main__":
+    launch_time = time.perf_counter()
+    parser = argparse.ArgumentParser(description="Word Puzzle")
+    parser.add_argument("--rows", type=int, default=5, help="число строк сетки")
+    parser.add_argument("--cols", type=int, default=6, help="число столбцов сетки")
+    parser.add_argument("--seed", type=int, default=None, help="зерно генератора сеток")
+    parser.add_argument("--min-words", type=int, default=20,
+                        help="сколько слов должно составляться из новой сетки")
+    parser.add_argument("--perf", nargs="?", const="perf.jsonl", default=None,
+                        help="включить замеры и писать их в JSONL-файл")
+    parser.add_argument("--round", type=int, default=60,
+                        help="длина раунда в секундах (0 — без ограничения)")
+    parser.add_argument("--reject-inflected", action="store_true",
+                        help="не засчитывать другую форму уже названного в раунде слова")
+    parser.add_argument("--room", default="127.0.0.1:8766", metavar="HOST:PORT",
+                        help="адрес round_server для режима «Соревнование»")
+    parser.add_argument("--dictionary", default="словарь.txt",
+                        help="файл словаря (с --shared-dictionary — только личные новые слова)")
+    parser.add_argument("--shared-dictionary", default=None, metavar="PATH",
+                        help="общий словарь только для чтения, общий для всех игроков")
+    parser.add_argument("--replay-dir", default="повторы",
+                        help="куда писать журналы повторов (пустая строка — не писать)")
+    parser.add_argument("--service", default=None, metavar="URL",
+                        help="проверять слова через word_service (например http://127.0.0.1:8765)")
+    args = parser.parse_args()
+    if args.perf:
+        metrics.enable(args.perf)
     root = tk.Tk()
-    app = LetterGridApp(root)
+    app = LetterGridApp(root, launch_time, args.rows, args.cols, args.seed, args.min_words,
+                        args.round or None, args.service, args.reject_inflected, args.room,
+                        args.replay_dir, args.dictionary, args.shared_dictionary)
     root.mainloop()
\ No newline at end of file
@@ -0,0 +1,44 @@
+def _role_options(theme):
+    """Параметры config для каждой роли виджета в одной теме"""
+    button = {'bg': theme['button_bg'], 'fg': theme['fg'], 'activebackground': theme['active_bg']}
+    return {
+        'window': {'bg': theme['bg']},
+        'frame': {'bg': theme['bg']},
+        'label': {'bg': theme['bg'], 'fg': theme['fg']},
+        'button': button,
+        'menu': button,
+        'flat_button': {'bg': theme['bg'], 'fg': theme['fg'], 'activebackground': theme['active_bg']},
+        'checkbutton': {'bg': theme['bg'], 'fg': theme['fg'], 'activebackground': theme['bg'],
+                        'activeforeground': theme['fg'], 'selectcolor': theme['button_bg']},
+        'entry': {'bg': theme['entry_bg'], 'fg': theme['fg'], 'insertbackground': theme['fg']},
+        'listbox': {'bg': theme['listbox_bg'], 'fg': theme['fg'],
+                    'selectbackground': theme['highlight']},
+        'scrollbar': {'bg': theme['button_bg']},
+    }
+
+
+class ThemeRegistry:
+    """Виджеты, зарегистрированные со своей ролью, и заранее собранные параметры тем.
+
+    Смена темы отправляет готовый словарь параметров каждому живому виджету;
+    уничтоженные виджеты сами выписываются из реестра по событию <Destroy>.
+    """
+
+    def __init__(self, themes):
+        self.options = {name: _role_options(theme) for name, theme in themes.items()}
+        self.widgets = {}
+
+    def register(self, widget, role):
+        self.widgets[widget] = role
+        widget.bind("<Destroy>", lambda event: self.on_destroy(event, widget), add="+")
+        return widget
+
+    def on_destroy(self, event, widget):
+        # Toplevel bindings also fire for their children, so check the source
+        if event.widget is widget:
+            self.widgets.pop(widget, None)
+
+    def apply(self, theme_name):
+        options = self.options[theme_name]
+        for widget, role in list(self.widgets.items()):
+            widget.config(**options[role])
@@ -0,0 +1,97 @@
+import os
+from collections import OrderedDict
+
+
+# First line of the file; verdicts saved without it were made by older rules
+# (words known only from словарь.txt counted) and are discarded
+HEADER = "#v2"
+
+
+def normalize_word(word):
+    return word.strip().lower()
+
+
+class ValidationCache:
+    """LRU-кэш результатов проверки слов: индекс словоформа -> лемма.
+
+    Для принятого слова хранится его начальная форма, для отклонённого —
+    пустая строка, так что повторная проверка любой формы — один поиск
+    в словаре без вызова parse.
+
+    Сохраняется в файл по строке на слово: "+слово<TAB>лемма" или "-слово",
+    от самых старых к самым свежим, чтобы при загрузке сохранился порядок LRU.
+    Файл без заголовка HEADER (прежний формат) не загружается.
+    """
+
+    def __init__(self, path=None, max_size=50000):
+        self.path = path
+        self.max_size = max_size
+        self.entries = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        if path:
+            self.load()
+
+    def get(self, word):
+        """Возвращает лемму, "" для отклонённого слова или None, если слова нет в кэше"""
+        key = normalize_word(word)
+        lemma = self.entries.get(key)
+        if lemma is None:
+            self.misses += 1
+            return None
+        self.entries.move_to_end(key)
+        self.hits += 1
+        return lemma
+
+    def put(self, word, lemma):
+        """Запоминает лемму слова; None или "" — слово отклонено"""
+        key = normalize_word(word)
+        self.entries[key] = lemma or ""
+        self.entries.move_to_end(key)
+        if len(self.entries) > self.max_size:
+            self.entries.popitem(last=False)
+
+    def lookup(self, word, find_lemma):
+        """Берёт лемму из кэша, а при промахе вызывает find_lemma(word) и запоминает её.
+
+        Возвращает лемму или "" для отклонённого слова.
+        """
+        lemma = self.get(word)
+        if lemma is None:
+            lemma = find_lemma(normalize_word(word)) or ""
+            self.put(word, lemma)
+        return lemma
+
+    def stats(self):
+        total = self.hits + self.misses
+        return {
+            'size': len(self.entries),
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_rate': self.hits / total if total else 0.0,
+        }
+
+    def load(self):
+        if not os.path.exists(self.path):
+            return
+        with open(self.path, 'r', encoding='utf-8') as f:
+            if f.readline().rstrip("\n") != HEADER:
+                return
+            for line in f:
+                line = line.rstrip("\n")
+                if line.startswith("-") and len(line) > 1:
+                    self.put(line[1:], "")
+                elif line.startswith("+"):
+                    word, _, lemma = line[1:].partition("\t")
+                    if word and lemma:
+                        self.put(word, lemma)
+
+    def save(self):
+        if not self.path:
+            return
+        tmp_path = self.path + ".tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            f.write(f"{HEADER}\n")
+            f.write("".join(f"+{word}\t{lemma}\n" if lemma else f"-{word}\n"
+                            for word, lemma in self.entries.items()))
+        os.replace(tmp_path, self.path)
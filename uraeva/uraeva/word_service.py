@@ -0,0 +1,369 @@
+"""Локальный HTTP-сервис проверки слов и чтения таблицы лидеров.
+
+Один прогретый MorphAnalyzer, словарь и кэш проверок на всех клиентов:
+страницы из lab3 и несколько копий игры не загружают анализатор каждая сама.
+
+    GET  /check?word=слова          {"word": "слова", "valid": true, "lemma": "слово"}
+    POST /check  {"words": [...]}    {"results": {"слова": true, ...},
+                                      "lemmas": {"слова": "слово", ...}}
+    GET  /leaderboard?limit=50&after=<cursor>&user=<ник>
+                                     {"rows": [...], "next": <cursor>|null, "rank": ...}
+    GET  /stats                      размер кэша, попадания, размеры пачек
+
+Соединения HTTP/1.1 держатся открытыми (keep-alive). Слова, пришедшие
+от разных запросов, пока проверяется предыдущая пачка, собираются в одну
+и проверяются одной задачей в рабочем потоке, который единолично владеет
+словарём и кэшем.
+
+Запуск:  python word_service.py [--port 8765]
+"""
+import argparse
+import asyncio
+import http.client
+import json
+import time
+from concurrent.futures import ThreadPoolExecutor
+from http import HTTPStatus
+from urllib.parse import parse_qs, quote, urlsplit
+
+from leaderboard import ScoreStore
+from morph_loader import MorphLoader, analyze
+from perf import metrics
+from validation_cache import ValidationCache, normalize_word
+from word_store import WordStore
+
+MAX_BODY = 1 << 20
+MAX_WORD = 64
+MAX_BATCH_WORDS = 1000
+IDLE_TIMEOUT = 30.0
+
+
+class HTTPError(Exception):
+    def __init__(self, status, message):
+        super().__init__(message)
+        self.status = status
+
+
+class CheckBatcher:
+    """Собирает слова из одновременных запросов в пачки.
+
+    Пока рабочий поток проверяет одну пачку, новые слова копятся и уходят
+    следующей пачкой, как только он освободится; если поток свободен, слово
+    уходит сразу (с теми, что пришли в той же итерации цикла событий).
+    Так одиночный запрос не ждёт, а под нагрузкой пачки растут сами.
+    Одно и то же слово из разных запросов проверяется один раз.
+    """
+
+    def __init__(self, validate_many, executor, max_batch=256):
+        self.validate_many = validate_many
+        self.executor = executor
+        self.max_batch = max_batch
+        self.waiting = {}
+        self.scheduled = False
+        self.busy = False
+        self.batches = 0
+        self.batched_words = 0
+
+    async def check(self, word):
+        future = self.waiting.get(word)
+        if future is None:
+            loop = asyncio.get_running_loop()
+            future = self.waiting[word] = loop.create_future()
+            if not self.busy and not self.scheduled:
+                self.scheduled = True
+                loop.call_soon(self.flush)
+        # A client that disconnects must not cancel a word other requests wait for
+        return await asyncio.shield(future)
+
+    async def check_many(self, words):
+        results = await asyncio.gather(*(self.check(word) for word in words))
+        return dict(zip(words, results))
+
+    def flush(self):
+        self.scheduled = False
+        if self.busy or not self.waiting:
+            return
+        if len(self.waiting) <= self.max_batch:
+            batch, self.waiting = self.waiting, {}
+        else:
+            words = list(self.waiting)[:self.max_batch]
+            batch = {word: self.waiting.pop(word) for word in words}
+        self.busy = True
+        self.batches += 1
+        self.batched_words += len(batch)
+        task = asyncio.get_running_loop().run_in_executor(
+            self.executor, self.validate_many, list(batch))
+        task.add_done_callback(lambda task: self._resolve(batch, task))
+
+    def _resolve(self, batch, task):
+        self.busy = False
+        if task.exception() is not None:
+            for future in batch.values():
+                if not future.done():
+                    future.set_exception(task.exception())
+        else:
+            results = task.result()
+            for word, future in batch.items():
+                if not future.done():
+                    future.set_result(results[word])
+        self.flush()
+
+
+class WordService:
+    """Состояние сервиса и обработчики запросов"""
+
+    def __init__(self, dictionary="словарь.txt", cache_path="проверки.cache",
+                 scores_path="рекорды.db", shared=None):
+        self.morph_loader = MorphLoader().start()
+        self.word_store = WordStore(dictionary, compiled=True, shared=shared)
+        self.validation_cache = ValidationCache(cache_path)
+        self.score_store = ScoreStore(scores_path)
+        # One worker owns the word store and the cache, as in the desktop app
+        self.executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="word-service")
+        self.batcher = CheckBatcher(self.validate_many, self.executor)
+        self.routes = {
+            ('GET', '/check'): self.get_check,
+            ('POST', '/check'): self.post_check,
+            ('GET', '/leaderboard'): self.get_leaderboard,
+            ('GET', '/stats'): self.get_stats,
+        }
+
+    def validate_many(self, words):
+        """Выполняется в рабочем потоке: леммы пачки слов (None для неверных)"""
+        with metrics.span("service.batch"):
+            return {word: self.validation_cache.lookup(word, self.find_lemma) or None
+                    for word in words}
+
+    def find_lemma(self, word):
+        morph = self.morph_loader.get()
+        with metrics.span("morph.parse"):
+            return analyze(morph, word)
+
+    @staticmethod
+    def clean_word(word):
+        word = normalize_word(word or "")
+        if not word or len(word) > MAX_WORD:
+            raise HTTPError(HTTPStatus.BAD_REQUEST, "слово должно быть от 1 до 64 символов")
+        return word
+
+    async def get_check(self, query, body):
+        word = self.clean_word(query.get('word', [""])[0])
+        lemma = await self.batcher.check(word)
+        return {'word': word, 'valid': lemma is not None, 'lemma': lemma}
+
+    async def post_check(self, query, body):
+        try:
+            words = json.loads(body)['words']
+        except (ValueError, KeyError, TypeError):
+            raise HTTPError(HTTPStatus.BAD_REQUEST, 'ожидается {"words": [...]}')
+        if not isinstance(words, list) or len(words) > MAX_BATCH_WORDS:
+            raise HTTPError(HTTPStatus.BAD_REQUEST, "не больше 1000 слов за запрос")
+        words = [self.clean_word(word) for word in words if isinstance(word, str)]
+        lemmas = await self.batcher.check_many(list(dict.fromkeys(words)))
+        return {'results': {word: lemma is not None for word, lemma in lemmas.items()},
+                'lemmas': lemmas}
+
+    async def get_leaderboard(self, query, body):
+        try:
+            limit = min(int(query.get('limit', ["50"])[0]), 200)
+            after = query.get('after', [None])[0]
+            if after is not None:
+                score, created_at, row_id = after.split(",")
+                after = (None, int(score), float(created_at), int(row_id))
+        except ValueError:
+            raise HTTPError(HTTPStatus.BAD_REQUEST, "неверные limit или after")
+        # SQLite reads are indexed and short, so they run on the event loop
+        rows = self.score_store.top(limit, after=after)
+        result = {
+            'rows': [{'user': user, 'score': score} for user, score, _, _ in rows],
+            'next': ",".join(map(str, rows[-1][1:])) if len(rows) == limit else None,
+        }
+        user = query.get('user', [None])[0]
+        if user:
+            result['rank'] = self.score_store.rank(user)
+        return result
+
+    async def get_stats(self, query, body):
+        batcher = self.batcher
+        return {
+            'cache': self.validation_cache.stats(),
+            'analyzer_ready': self.morph_loader.ready(),
+            'batches': batcher.batches,
+            'mean_batch': batcher.batched_words / batcher.batches if batcher.batches else 0.0,
+        }
+
+    async def handle_connection(self, reader, writer):
+        try:
+            while True:
+                try:
+                    request_line = await asyncio.wait_for(reader.readline(), IDLE_TIMEOUT)
+                except asyncio.TimeoutError:
+                    break
+                if not request_line:
+                    break
+                keep_alive = await self.handle_request(request_line, reader, writer)
+                await writer.drain()
+                if not keep_alive:
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError, ValueError):
+            pass
+        finally:
+            writer.close()
+
+    async def handle_request(self, request_line, reader, writer):
+        """Читает и обрабатывает один запрос; возвращает, держать ли соединение"""
+        method, target, version = request_line.decode('latin-1').split()
+        headers = {}
+        while True:
+            line = await reader.readline()
+            if line in (b"\r\n", b"\n", b""):
+                break
+            name, _, value = line.decode('latin-1').partition(":")
+            headers[name.strip().lower()] = value.strip()
+
+        connection = headers.get('connection', "").lower()
+        keep_alive = connection == "keep-alive" if version == "HTTP/1.0" else connection != "close"
+        length = int(headers.get('content-length', 0))
+        if length > MAX_BODY:
+            self.respond(writer, HTTPStatus.REQUEST_ENTITY_TOO_LARGE,
+                         {'error': "слишком большой запрос"}, keep_alive=False)
+            return False
+        body = await reader.readexactly(length) if length else b""
+
+        if method == 'OPTIONS':
+            # CORS preflight from the lab3 pages
+            self.respond(writer, HTTPStatus.NO_CONTENT, None, keep_alive)
+            return keep_alive
+
+        url = urlsplit(target)
+        handler = self.routes.get((method, url.path))
+        start = time.perf_counter()
+        try:
+            if handler is None:
+                raise HTTPError(HTTPStatus.NOT_FOUND, "нет такого адреса")
+            status, payload = HTTPStatus.OK, await handler(parse_qs(url.query), body)
+        except HTTPError as e:
+            status, payload = e.status, {'error': str(e)}
+        except Exception as e:
+            status, payload = HTTPStatus.INTERNAL_SERVER_ERROR, {'error': str(e)}
+        metrics.observe("service" + url.path, time.perf_counter() - start)
+        self.respond(writer, status, payload, keep_alive)
+        return keep_alive
+
+    @staticmethod
+    def respond(writer, status, payload, keep_alive):
+        body = b"" if payload is None else json.dumps(payload, ensure_ascii=False).encode('utf-8')
+        head = (
+            f"HTTP/1.1 {status.value} {status.phrase}\r\n"
+            "Content-Type: application/json; charset=utf-8\r\n"
+            f"Content-Length: {len(body)}\r\n"
+            "Access-Control-Allow-Origin: *\r\n"
+            "Access-Control-Allow-Methods: GET, POST, OPTIONS\r\n"
+            "Access-Control-Allow-Headers: Content-Type\r\n"
+            f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n"
+            "\r\n"
+        )
+        writer.write(head.encode('latin-1') + body)
+
+    async def save_periodically(self, interval=30.0):
+        loop = asyncio.get_running_loop()
+        while True:
+            await asyncio.sleep(interval)
+            await loop.run_in_executor(self.executor, self.save)
+
+    def save(self):
+        self.word_store.sync()
+        # Only this worker thread reads the store, so replaced files can go now
+        for base in self.word_store.take_retired():
+            base.close()
+        self.validation_cache.save()
+
+    async def serve(self, host="127.0.0.1", port=8765):
+        server = await asyncio.start_server(self.handle_connection, host, port)
+        saver = asyncio.create_task(self.save_periodically())
+        print(f"Сервис проверки слов: http://{host}:{port}")
+        try:
+            async with server:
+                await server.serve_forever()
+        finally:
+            saver.cancel()
+            self.executor.submit(self.save).result()
+            self.executor.shutdown()
+            self.score_store.close()
+
+
+class WordServiceClient:
+    """Клиент сервиса с одним постоянным соединением.
+
+    Если сервер закрыл соединение между запросами, запрос повторяется
+    один раз на новом соединении. Объект не делится между потоками.
+    """
+
+    def __init__(self, url="http://127.0.0.1:8765", timeout=10.0):
+        parts = urlsplit(url)
+        self.conn = http.client.HTTPConnection(parts.hostname, parts.port or 80, timeout=timeout)
+
+    def request(self, method, path, payload=None):
+        body = None if payload is None else json.dumps(payload, ensure_ascii=False).encode('utf-8')
+        headers = {'Content-Type': 'application/json'} if body is not None else {}
+        for attempt in range(2):
+            try:
+                self.conn.request(method, path, body=body, headers=headers)
+                response = self.conn.getresponse()
+                data = json.loads(response.read())
+                break
+            except (ConnectionError, http.client.HTTPException):
+                self.conn.close()
+                if attempt:
+                    raise
+        if response.status != HTTPStatus.OK:
+            raise RuntimeError(data.get('error', response.reason))
+        return data
+
+    def check(self, word):
+        return self.lemma(word) is not None
+
+    def lemma(self, word):
+        """Начальная форма слова или None, если слово неверное"""
+        return self.request('GET', "/check?word=" + quote(word))['lemma']
+
+    def check_many(self, words):
+        return self.request('POST', "/check", {'words': list(words)})['results']
+
+    def leaderboard(self, limit=50, after=None, user=None):
+        path = f"/leaderboard?limit={limit}"
+        if after:
+            path += "&after=" + quote(after)
+        if user:
+            path += "&user=" + quote(user)
+        return self.request('GET', path)
+
+    def close(self):
+        self.conn.close()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Локальный сервис проверки слов")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--dictionary", default="словарь.txt")
+    parser.add_argument("--shared", default=None, metavar="PATH",
+                        help="общий словарь только для чтения; --dictionary хранит лишь новые слова")
+    parser.add_argument("--cache", default="проверки.cache")
+    parser.add_argument("--scores", default="рекорды.db")
+    parser.add_argument("--perf", nargs="?", const="perf.jsonl", default=None,
+                        help="включить замеры и писать их в JSONL-файл")
+    args = parser.parse_args(argv)
+    if args.perf:
+        metrics.enable(args.perf)
+    service = WordService(args.dictionary, args.cache, args.scores, args.shared)
+    try:
+        asyncio.run(service.serve(args.host, args.port))
+    except KeyboardInterrupt:
+        pass
+    finally:
+        metrics.flush()
+
+
+if __name__ == "__main__":
+    main()
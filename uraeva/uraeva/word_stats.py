@@ -0,0 +1,118 @@
+"""Статистика принятых слов, которая обновляется по одному слову.
+
+Каждое принятое слово за O(1) попадает в счётчики по длине, первой букве,
+буквам, части речи, по самой лемме и по игроку; отклонённые слова
+учитываются в попытках по длине, чтобы считать долю принятых. Окну помощи
+и генератору сеток не нужно перечитывать словарь.
+
+Сохраняется в JSON целиком: сначала во временный файл, затем os.replace.
+"""
+import json
+import os
+from collections import Counter
+
+# pymorphy3 part-of-speech tags as shown to the player
+PART_NAMES = {
+    'NOUN': "существительные", 'ADJF': "прилагательные", 'ADJS': "краткие прилагательные",
+    'COMP': "сравнительные степени", 'VERB': "глаголы", 'INFN': "инфинитивы",
+    'PRTF': "причастия", 'PRTS': "краткие причастия", 'GRND': "деепричастия",
+    'NUMR': "числительные", 'ADVB': "наречия", 'NPRO': "местоимения",
+    'PRED': "предикативы", 'PREP': "предлоги", 'CONJ': "союзы", 'PRCL': "частицы",
+    'INTJ': "междометия", "": "неизвестно",
+}
+
+# Counters whose keys are word lengths; JSON turns them into strings
+_LENGTH_COUNTERS = ('attempts', 'lengths')
+_COUNTERS = _LENGTH_COUNTERS + ('first_letters', 'letters', 'parts', 'words', 'players')
+
+
+class WordStats:
+    """Счётчики принятых слов.
+
+    attempts и lengths — проверенные и принятые слова по длине,
+    first_letters и letters — первые и все буквы принятых слов,
+    parts — части речи, words — сколько раз принята каждая лемма,
+    players — сколько слов принято у каждого игрока.
+    """
+
+    def __init__(self, path=None):
+        self.path = path
+        for name in _COUNTERS:
+            setattr(self, name, Counter())
+        self.checked = 0
+        self.accepted = 0
+        # Part of speech of every lemma seen, so each one is parsed only once
+        self.parts_of = {}
+        self.dirty = False
+        if path:
+            self.load()
+
+    def add(self, word, lemma, part=None, player=None):
+        """Учитывает принятое слово; part — тег части речи (None — взять известный)"""
+        length = len(word)
+        self.checked += 1
+        self.accepted += 1
+        self.attempts[length] += 1
+        self.lengths[length] += 1
+        self.first_letters[word[0]] += 1
+        self.letters.update(word)
+        if part is None:
+            part = self.parts_of.get(lemma, "")
+        else:
+            self.parts_of[lemma] = part
+        self.parts[part] += 1
+        self.words[lemma] += 1
+        if player:
+            self.players[player] += 1
+        self.dirty = True
+
+    def reject(self, word):
+        """Учитывает отклонённое слово"""
+        self.checked += 1
+        self.attempts[len(word)] += 1
+        self.dirty = True
+
+    def acceptance_rate(self, length=None):
+        """Доля принятых среди проверенных слов (всех или данной длины)"""
+        if length is None:
+            return self.accepted / self.checked if self.checked else 0.0
+        attempts = self.attempts[length]
+        return self.lengths[length] / attempts if attempts else 0.0
+
+    def letter_weights(self, base, blend=0.5, min_letters=500):
+        """Веса букв для generate_letters: base, смешанные с буквами принятых слов.
+
+        Пока принятых букв меньше min_letters, возвращается None (веса по
+        умолчанию). Буквы, которых нет в base, не добавляются.
+        """
+        used = sum(self.letters[letter.lower()] for letter in base)
+        if used < min_letters:
+            return None
+        total = sum(base.values())
+        return {letter: (1 - blend) * weight / total + blend * self.letters[letter.lower()] / used
+                for letter, weight in base.items()}
+
+    def load(self):
+        if not os.path.exists(self.path):
+            return
+        with open(self.path, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+        for name in _COUNTERS:
+            counts = data.get(name, {})
+            if name in _LENGTH_COUNTERS:
+                counts = {int(length): count for length, count in counts.items()}
+            setattr(self, name, Counter(counts))
+        self.checked = data.get('checked', 0)
+        self.accepted = data.get('accepted', 0)
+        self.parts_of = data.get('parts_of', {})
+
+    def save(self):
+        if not self.path or not self.dirty:
+            return
+        data = {name: getattr(self, name) for name in _COUNTERS}
+        data.update(checked=self.checked, accepted=self.accepted, parts_of=self.parts_of)
+        tmp_path = self.path + ".tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(data, f, ensure_ascii=False)
+        os.replace(tmp_path, self.path)
+        self.dirty = False
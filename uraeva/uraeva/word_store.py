@@ -0,0 +1,403 @@
+import bisect
+import hashlib
+import heapq
+import os
+
+from file_lock import FileLock
+from compact_dict import (CompactDictionary, compile_dictionary, compiled_path, ensure_compiled,
+                          is_compiled)
+
+# Bytes before the read offset that are compared to tell an append from a rewrite
+TAIL_SIZE = 64
+
+
+def open_shared(path, cache_dir):
+    """Открывает общий словарь только для чтения.
+
+    Если рядом с path уже лежит собранный из него двоичный файл, он
+    открывается без блокировок и записи. Иначе словарь собирается рядом
+    с path, а если туда писать нельзя (например, каталог смонтирован только
+    для чтения), — в cache_dir.
+    """
+    out_path = compiled_path(path)
+    if is_compiled(path, out_path):
+        return CompactDictionary(out_path)
+    if not os.access(os.path.dirname(os.path.abspath(path)), os.W_OK):
+        # Named after the full path, so different shared dictionaries do not collide
+        name = hashlib.sha1(os.path.abspath(path).encode('utf-8')).hexdigest()[:16]
+        out_path = os.path.join(cache_dir, f"общий-{name}.dict")
+    # Several processes may be the first to open the shared dictionary
+    with FileLock(out_path + ".lock"):
+        return CompactDictionary(ensure_compiled(path, out_path))
+
+
+class SortedOverlay:
+    """Отсортированное объединение большого словаря base и небольшого списка added.
+
+    Слова из added в base не встречаются. Для каждого добавленного слова
+    хранится его позиция в объединении, так что доступ по индексу стоит
+    двоичного поиска по added, без копирования base.
+    """
+
+    def __init__(self, base, added=()):
+        self.reset(base, added)
+
+    def reset(self, base, added=()):
+        """Меняет base; added — отсортированные слова, которых в base нет"""
+        self.base = base
+        self.added = list(added)
+        self.positions = [j + base.lower_bound(word) for j, word in enumerate(self.added)]
+
+    def copy(self):
+        other = SortedOverlay.__new__(SortedOverlay)
+        other.base = self.base
+        other.added = list(self.added)
+        other.positions = list(self.positions)
+        return other
+
+    def insert(self, word):
+        j = bisect.bisect_left(self.added, word)
+        self.added.insert(j, word)
+        self.positions.insert(j, j + self.base.lower_bound(word))
+        for k in range(j + 1, len(self.positions)):
+            self.positions[k] += 1
+
+    def prefix_range(self, prefix):
+        """Диапазон индексов [lo, hi) слов, начинающихся с prefix"""
+        base_lo, base_hi = self.base.prefix_range(prefix)
+        lo = bisect.bisect_left(self.added, prefix)
+        hi = bisect.bisect_left(self.added, prefix + "\uffff", lo)
+        return base_lo + lo, base_hi + hi
+
+    def __len__(self):
+        return len(self.base) + len(self.added)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(len(self)))]
+        if index < 0:
+            index += len(self)
+        k = bisect.bisect_left(self.positions, index)
+        if k < len(self.positions) and self.positions[k] == index:
+            return self.added[k]
+        return self.base[index - k]
+
+    def __iter__(self):
+        return heapq.merge(self.base, self.added)
+
+
+class WordStore:
+    """Словарь в памяти: множество для проверки и отсортированный список для показа.
+
+    Файл читается один раз. Новые слова копятся в буфере и дописываются
+    в конец файла пачками, а время от времени файл переписывается
+    отсортированным и без дубликатов.
+
+    Файл могут одновременно использовать несколько копий игры. Запись
+    и перечитывание идут под межпроцессной блокировкой (см. file_lock);
+    перед записью дочитываются строки, дописанные другими процессами после
+    сохранённого смещения, так что слова не дублируются и не теряются.
+    Если файл был переписан целиком (сменился inode, он стал короче или
+    байты перед смещением уже другие), он перечитывается заново.
+    С fsync=True каждая пачка сбрасывается на диск.
+
+    С compiled=True основная часть словаря не загружается в память, а читается
+    из двоичного файла (см. compact_dict) через mmap; в памяти остаются
+    только слова, добавленные после его сборки.
+
+    shared — путь к общему словарю только для чтения (например, большому
+    базовому словарю для всех игроков или комнат). Он собирается в двоичный
+    файл один раз и открывается через mmap, так что все процессы делят одни
+    и те же страницы в памяти, а файл path становится небольшим личным
+    слоем: в него пишутся только слова, которых нет в общем словаре.
+    Слой читается как текст, compiled при этом не действует. Если общий
+    словарь лежит там, куда писать нельзя, двоичный файл собирается рядом
+    с path (см. open_shared).
+
+    Объект не потокобезопасен: им пользуется один поток. Другим потокам
+    отдаётся snapshot() — неизменяемая копия отсортированного списка.
+    Двоичный файл, заменённый при перечитывании или сжатии, не закрывается
+    сразу, ведь его ещё могут читать старые снимки: take_retired() отдаёт
+    такие файлы владельцу, и тот закрывает их, когда снимки заменены.
+    """
+
+    def __init__(self, path, flush_every=16, compact_min=1000, compact_ratio=0.25,
+                 compiled=False, fsync=False, shared=None):
+        self.path = path
+        self.flush_every = flush_every
+        self.compact_min = compact_min
+        self.compact_ratio = compact_ratio
+        self.compiled = compiled and not shared
+        self.fsync = fsync
+        self.lock = FileLock(path + ".lock")
+        self.base = None
+        self.retired = []
+        self.shared = None
+        if shared:
+            self.shared = open_shared(shared, os.path.dirname(path) or ".")
+
+        self.words = set()
+        self.sorted_words = []
+        self.pending = []
+        # Lines written to the file since it was last sorted (appends and duplicates)
+        self.unsorted_lines = 0
+        # How much of the file has been read, and which file it was
+        self.offset = 0
+        self.file_id = None
+        self.tail = b""
+        self.missing_newline = False
+        # Words picked up from other processes since the last sync()
+        self.incoming = []
+        self.reloaded = False
+        # Bumped on every change, so an unchanged store reuses its snapshot
+        self.version = 0
+        self.snapshot_cache = None
+        self.load()
+
+    def load(self):
+        """Читает файл словаря целиком и строит индекс"""
+        with self.lock:
+            self._load()
+
+    def _load(self):
+        self.version += 1
+        self.words = set()
+        self.unsorted_lines = 0
+        self.offset = 0
+        self.file_id = None
+        self.tail = b""
+        self.missing_newline = False
+        if self.compiled:
+            self.open_base(CompactDictionary(ensure_compiled(self.path, allow_tail=True)))
+            # Lines appended after the binary file was built go to the overlay
+            words = self._read_from(self.base.source_size, self.base.source_tail)
+            if words is None:
+                self.open_base(CompactDictionary(compile_dictionary(self.path)))
+                self._skip_to_end()
+                words = []
+            self.missing_newline = self.tail[-1:] not in (b"", b"\n")
+            self.words = {word for word in words if word not in self.base}
+            self.sorted_words.reset(self.base, sorted(self.words))
+            self.unsorted_lines += len(words)
+        else:
+            previous = None
+            for word in self._read_from(0):
+                if (word in self.words or (previous is not None and word < previous)
+                        # Already in the shared layer; dropped at the next compaction
+                        or (self.shared is not None and word in self.shared)):
+                    self.unsorted_lines += 1
+                if self.shared is None or word not in self.shared:
+                    self.words.add(word)
+                previous = word
+            if self.shared is None:
+                self.sorted_words = sorted(self.words)
+            elif isinstance(self.sorted_words, SortedOverlay):
+                self.sorted_words.reset(self.shared, sorted(self.words))
+            else:
+                self.sorted_words = SortedOverlay(self.shared, sorted(self.words))
+
+        # Unwritten words of this process survive a reload
+        pending, self.pending = self.pending, []
+        for word in pending:
+            if word not in self:
+                self._index(word)
+                self.pending.append(word)
+
+    def _skip_to_end(self):
+        """Запоминает, что файл прочитан целиком, не читая его"""
+        try:
+            f = open(self.path, 'rb')
+        except FileNotFoundError:
+            return
+        with f:
+            st = os.fstat(f.fileno())
+            f.seek(max(0, st.st_size - TAIL_SIZE))
+            self.tail = f.read()
+        self.missing_newline = self.tail[-1:] not in (b"", b"\n")
+        self.file_id = (st.st_dev, st.st_ino)
+        self.offset = st.st_size
+
+    def _read_from(self, offset, tail=b""):
+        """Читает слова из файла начиная с байта offset и запоминает, докуда прочитано.
+
+        tail — байты, которые должны стоять прямо перед offset; если они
+        другие, файл был переписан, и возвращается None.
+        """
+        try:
+            f = open(self.path, 'rb')
+        except FileNotFoundError:
+            return []
+        with f:
+            st = os.fstat(f.fileno())
+            f.seek(offset - len(tail))
+            data = f.read()
+        if not data.startswith(tail):
+            return None
+        self.tail = data[-TAIL_SIZE:]
+        data = data[len(tail):]
+        self.file_id = (st.st_dev, st.st_ino)
+        self.offset = offset + len(data)
+        if data:
+            self.missing_newline = not data.endswith(b"\n")
+        words = []
+        for line in data.decode('utf-8').splitlines():
+            word = line.strip().lower()
+            if word:
+                words.append(word)
+        return words
+
+    def refresh(self):
+        """Подхватывает слова, записанные в файл другими процессами"""
+        with self.lock:
+            self._refresh()
+
+    def _refresh(self):
+        try:
+            st = os.stat(self.path)
+        except FileNotFoundError:
+            st = None
+        if st is None and self.file_id is None:
+            return
+        new_words = None
+        if st is not None and (st.st_dev, st.st_ino) == self.file_id and st.st_size >= self.offset:
+            if st.st_size == self.offset:
+                return
+            new_words = self._read_from(self.offset, self.tail)
+        if new_words is None:
+            # The file was replaced or rewritten by another process; an inode
+            # can be reused after a rename, so _read_from also checks the tail
+            self._load()
+            self.reloaded = True
+            return
+        self.unsorted_lines += len(new_words)
+        written = set()
+        for word in new_words:
+            if word not in self:
+                self._index(word)
+                self.incoming.append(word)
+            else:
+                written.add(word)
+        if written and self.pending:
+            # Another process has already saved some of our words
+            self.pending = [word for word in self.pending if word not in written]
+
+    def sync(self):
+        """Записывает накопленные слова и возвращает слова других процессов.
+
+        Возвращает список слов, появившихся в файле с прошлого вызова,
+        или None, если файл был перечитан целиком.
+        """
+        with self.lock:
+            self.flush()
+            self._refresh()
+        incoming, self.incoming = self.incoming, []
+        if self.reloaded:
+            self.reloaded = False
+            return None
+        return incoming
+
+    def open_base(self, base):
+        if self.base is not None:
+            self.retired.append(self.base)
+        self.base = base
+        self.version += 1
+        self.words = set()
+        if isinstance(self.sorted_words, SortedOverlay):
+            self.sorted_words.reset(base)
+        else:
+            self.sorted_words = SortedOverlay(base)
+
+    def take_retired(self):
+        """Отдаёт заменённые двоичные словари; закрыть их можно, когда их никто не читает"""
+        retired, self.retired = self.retired, []
+        return retired
+
+    def snapshot(self):
+        """Неизменяемая копия отсортированного списка слов для чтения из других потоков"""
+        if self.snapshot_cache is None or self.snapshot_cache[0] != self.version:
+            if isinstance(self.sorted_words, SortedOverlay):
+                words = self.sorted_words.copy()
+            else:
+                words = tuple(self.sorted_words)
+            self.snapshot_cache = (self.version, words)
+        return self.snapshot_cache[1]
+
+    def __contains__(self, word):
+        # The in-memory set first: it is the cheapest layer and holds the newest words
+        return (word in self.words
+                or (self.base is not None and word in self.base)
+                or (self.shared is not None and word in self.shared))
+
+    def __len__(self):
+        return len(self.sorted_words)
+
+    def __iter__(self):
+        return iter(self.sorted_words)
+
+    def _index(self, word):
+        self.version += 1
+        self.words.add(word)
+        if isinstance(self.sorted_words, SortedOverlay):
+            self.sorted_words.insert(word)
+        else:
+            bisect.insort(self.sorted_words, word)
+
+    def add(self, word):
+        """Добавляет слово; возвращает False, если оно уже есть"""
+        if word in self:
+            return False
+        self._index(word)
+        self.pending.append(word)
+        if len(self.pending) >= self.flush_every:
+            self.flush()
+        return True
+
+    def flush(self):
+        """Дописывает накопленные слова в конец файла"""
+        if not self.pending:
+            return
+        with self.lock:
+            self._refresh()
+            if not self.pending:
+                return
+            data = "".join(f"{word}\n" for word in self.pending).encode('utf-8')
+            if self.missing_newline:
+                data = b"\n" + data
+            with open(self.path, 'ab') as f:
+                f.write(data)
+                f.flush()
+                if self.fsync:
+                    os.fsync(f.fileno())
+                st = os.fstat(f.fileno())
+            self.file_id = (st.st_dev, st.st_ino)
+            self.offset = st.st_size
+            self.tail = (self.tail + data)[-TAIL_SIZE:]
+            self.missing_newline = False
+            self.unsorted_lines += len(self.pending)
+            self.pending = []
+            # With a shared layer only this store's own words are in the file
+            size = len(self.words) if self.shared is not None else len(self)
+            if self.unsorted_lines >= max(self.compact_min, self.compact_ratio * size):
+                self.compact()
+
+    def compact(self):
+        """Переписывает файл отсортированным списком без дубликатов"""
+        with self.lock:
+            self._refresh()
+            self.pending = []
+            words = sorted(self.words) if self.shared is not None else self.sorted_words
+            tmp_path = self.path + ".tmp"
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                f.writelines(f"{word}\n" for word in words)
+                if self.fsync:
+                    f.flush()
+                    os.fsync(f.fileno())
+            os.replace(tmp_path, self.path)
+            self.unsorted_lines = 0
+            self._skip_to_end()
+            if self.compiled:
+                self.open_base(CompactDictionary(compile_dictionary(self.path,
+                                                                    compiled_path(self.path))))
+
+    def close(self):
+        self.flush()